@@ -1,16 +1,47 @@
-from pyswip import Prolog
 import tkinter as tk
-from tkinter import messagebox, simpledialog, Toplevel, font
-from PIL import Image, ImageTk
+from tkinter import messagebox, Toplevel, font
+import argparse
 import time
+from collections import deque
+
+from agent_worker import AgentWorker
+from board_view import CANVAS_THRESHOLD, CellStyle, create_board
+from logical_agent import ProbabilisticAgent
+from replay import ReplayRecorder
+from wumpus_engine import DIRECTIONS, GRID_SIZE, START, random_layout
+
+# How often the UI drains the agent worker's queue, in milliseconds
+POLL_INTERVAL = 16
+
+# Lines kept in the action log, in memory and in the widget
+LOG_SIZE = 50
 
 class WumpusWorldGUI:
-    def __init__(self, root):
+    def __init__(self, root, world_factory=None, size=GRID_SIZE,
+                 agent_factory=ProbabilisticAgent, replay_path=None):
         self.root = root
+        if world_factory is None:
+            # The Prolog backend (and SWI-Prolog with it) loads with the GUI
+            from prolog_world import PrologWumpusWorld
+            world_factory = PrologWumpusWorld
+        self.world_factory = world_factory
+        self.agent_factory = agent_factory
+        self.size = size
         self.root.geometry("1000x700")
         self.root.title("Wumpus World Game")
         self.setup_custom_styles()
-        self.action_log = []
+        # Log entries wait in pending_log and reach the widget in one batch
+        # per frame; the timestamp is formatted once per second at most
+        self.action_log = deque(maxlen=LOG_SIZE)
+        self.pending_log = []
+        self.log_flush = None
+        self.log_second = None
+        self.log_stamp = ""
+        # With a replay_path every action is recorded for replay.py
+        self.replay_path = replay_path
+        self.recorder = None
+        self.agent = None
+        self.worker = None
         self.show_rules()
         
     def setup_custom_styles(self):
@@ -25,6 +56,13 @@ class WumpusWorldGUI:
         self.log_bg = "#2c3e50"
         self.log_text = "#ecf0f1"
         
+        # Cell styles for the board
+        self.default_style = CellStyle(self.cell_bg, "", tk.RAISED, "#bdbdbd", 2, "black")
+        self.agent_style = CellStyle(self.agent_color, "Agent", tk.SUNKEN, "#0288d1", 3, "black")
+        self.adjacent_style = CellStyle(self.safe_color, "", tk.RAISED, "#66bb6a", 2, "black")
+        self.pit_style = CellStyle("black", "Pit", tk.RAISED, "#000000", 2, "white")
+        self.wumpus_style = CellStyle("red", "Wumpus", tk.RAISED, "#d32f2f", 2, "black")
+        
         # Configure root window
         self.root.configure(bg=self.bg_color)
         
@@ -38,9 +76,9 @@ class WumpusWorldGUI:
         rules_frame.pack(expand=True, fill=tk.BOTH)
         
         # Rules text
-        rules_text = """🌍 Wumpus World Game Rules 🌍
+        rules_text = f"""🌍 Wumpus World Game Rules 🌍
 
-1. The world is a 4x4 grid
+1. The world is a {self.size}x{self.size} grid
 2. You start at (1,1) facing right
 3. Dangers:
    - Wumpus: Kills you if you enter its room (stench nearby)
@@ -48,7 +86,7 @@ class WumpusWorldGUI:
 4. Goal: Find the gold and return to (1,1) to win
 5. Actions:
    - Move to adjacent squares
-   - Shoot arrow (one direction, costs 10 points)
+   - Shoot arrow along a row or column (costs 10 points)
    - Grab gold when you find it
    - Climb out at (1,1) with gold to win
 
@@ -76,42 +114,20 @@ class WumpusWorldGUI:
             widget.destroy()
             
         self.root.title("Wumpus Game Logical Agent")
-        self.prolog = Prolog()
-        self.setup_prolog()
+        if getattr(self, "world", None) is not None:
+            self.world.close()
+        self.world = self.world_factory(size=self.size)
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.replay_path is not None:
+            self.recorder = ReplayRecorder(self.replay_path, self.world)
+        self.stop_autoplay()
+        self.aiming = False
+        self.history = []
+        self.autoplay_delay = 16 if self.world.size > CANVAS_THRESHOLD else 400
         self.create_widgets()
         self.update_display()
         
-    def setup_prolog(self):
-        # Initialize dynamic predicates
-        self.prolog.assertz(":- dynamic([breeze/1, stench/1, glitter/1, wumpus_location/1, pit_location/1, gold_location/1, agent_location/1, timer/1, score/1, wumpus_final_location/1, has_gold/1, wumpus_dead/1])")
-        
-        # Add adjacent facts
-        for x in range(1, 5):
-            for y in range(1, 5):
-                if x < 4:
-                    self.prolog.assertz(f"adjacent([{x},{y}], [{x+1},{y}])")
-                if x > 1:
-                    self.prolog.assertz(f"adjacent([{x},{y}], [{x-1},{y}])")
-                if y < 4:
-                    self.prolog.assertz(f"adjacent([{x},{y}], [{x},{y+1}])")
-                if y > 1:
-                    self.prolog.assertz(f"adjacent([{x},{y}], [{x},{y-1}])")
-        
-        # Initialize game elements
-        self.prolog.assertz("gold_location([3,3])")
-        self.prolog.assertz("wumpus_location([4,4])")
-        self.prolog.assertz("pit_location([1,4])")
-        self.prolog.assertz("pit_location([3,1])")
-        self.prolog.assertz("agent_location([1,1])")
-        self.prolog.assertz("wumpus_final_location([-1,-1])")
-        self.prolog.assertz("score(30)")
-        self.prolog.assertz("timer(0)")
-        self.prolog.assertz("has_gold(0)")
-        self.prolog.assertz("wumpus_dead(0)")
-        
-        # Initialize percepts for starting position
-        self.update_percepts(1, 1)
-        
     def create_widgets(self):
         # Main container
         main_container = tk.Frame(self.root, bg=self.bg_color)
@@ -139,15 +155,8 @@ class WumpusWorldGUI:
         self.board_frame = tk.Frame(left_panel, bg=self.bg_color)
         self.board_frame.pack(pady=20)
         
-        self.cells = {}
-        for y in range(4, 0, -1):  # Rows from 4 to 1 (top to bottom)
-            for x in range(1, 5):  # Columns from 1 to 4
-                cell = tk.Button(self.board_frame, text="", width=8, height=4,
-                               font=('Poppins', 10), relief=tk.RAISED, bd=2,
-                               command=lambda x=x, y=y: self.make_move(x, y))
-                cell.grid(row=4-y, column=x-1, padx=5, pady=5)
-                self.cells[(x, y)] = cell
-                self.style_cell_button(cell)
+        self.board = create_board(self.board_frame, self.world.size, self.click_cell,
+                                  self.default_style, self.style_cell_button, self.bg_color)
         
         # Information display
         self.info_frame = tk.Frame(left_panel, bg=self.bg_color)
@@ -161,14 +170,21 @@ class WumpusWorldGUI:
                                    font=('Poppins', 12), bg=self.bg_color, fg=self.text_color)
         self.wumpus_label.pack()
         
+        self.agent_label = tk.Label(self.info_frame, text="",
+                                  font=('Poppins', 10), bg=self.bg_color, fg=self.text_color)
+        self.agent_label.pack()
+        
         # Control buttons
         self.control_frame = tk.Frame(left_panel, bg=self.bg_color)
         self.control_frame.pack(pady=20)
         
         buttons = [
+            ("Autoplay", self.start_autoplay),
             ("Shoot Arrow", self.shoot_arrow),
             ("Grab Gold", self.grab_gold),
             ("Climb Out", self.climb_out),
+            ("Return to Exit", lambda: self.walk_to(*START)),
+            ("Undo", self.undo_move),
             ("Display Rules", self.show_rules_popup),
             ("Restart", self.restart_game),
             ("Quit", self.quit_game)
@@ -212,70 +228,93 @@ class WumpusWorldGUI:
         button.bind("<Leave>", lambda e: button.config(bg=color_from))
         
     def add_log_entry(self, message):
-        timestamp = time.strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\n"
+        now = int(time.time())
+        if now != self.log_second:
+            self.log_second = now
+            self.log_stamp = time.strftime("%H:%M:%S", time.localtime(now))
+        log_entry = f"[{self.log_stamp}] {message}\n"
         
         self.action_log.append(log_entry)
-        if len(self.action_log) > 50:  # Limit log size
-            self.action_log.pop(0)
-            
+        self.pending_log.append(log_entry)
+        self.schedule_flush()
+        
+    def schedule_flush(self):
+        if self.log_flush is None:
+            self.log_flush = self.root.after(POLL_INTERVAL, self.flush_log)
+        
+    def flush_log(self):
+        # Write everything logged since the last frame in one insert, then
+        # trim the widget to the last LOG_SIZE lines
+        self.log_flush = None
+        if self.recorder is not None:
+            self.recorder.flush()
+        entries = self.pending_log[-LOG_SIZE:]
+        self.pending_log = []
+        if not entries or not self.log_text.winfo_exists():
+            return
         self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, log_entry)
+        self.log_text.insert(tk.END, "".join(entries))
+        lines = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if lines > LOG_SIZE:
+            self.log_text.delete("1.0", f"{lines - LOG_SIZE + 1}.0")
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
         
-    def update_percepts(self, x, y):
-        # Clear old percepts
-        self.prolog.retractall(f"breeze([{x},{y}])")
-        self.prolog.retractall(f"stench([{x},{y}])")
-        self.prolog.retractall(f"glitter([{x},{y}])")
+    def record(self, action, undoable=False):
+        # Append the action just applied to the replay, if one is recorded;
+        # undoable when its snapshot went on self.history
+        if self.recorder is None:
+            return
+        self.recorder.record(action, undoable)
+        if self.world.done:
+            self.recorder.flush()
+        else:
+            self.schedule_flush()
         
-        # Check for adjacent pits (breeze)
-        adjacent = list(self.prolog.query(f"adjacent([{x},{y}], [A,B]), pit_location([A,B])"))
-        if adjacent:
-            self.prolog.assertz(f"breeze([{x},{y}])")
+    def log_percepts(self, percepts):
+        x, y = self.world.position
+        if percepts.breeze:
             self.add_log_entry(f"Sensed: Breeze at ({x},{y})")
-        
-        # Check for adjacent wumpus (stench)
-        if not list(self.prolog.query("wumpus_dead(1)")):  # Only if Wumpus is alive
-            adjacent = list(self.prolog.query(f"adjacent([{x},{y}], [A,B]), wumpus_location([A,B])"))
-            if adjacent:
-                self.prolog.assertz(f"stench([{x},{y}])")
-                self.add_log_entry(f"Sensed: Stench at ({x},{y})")
-        
-        # Check for gold (glitter)
-        if list(self.prolog.query(f"gold_location([{x},{y}])")) and not list(self.prolog.query("has_gold(1)")):
-            self.prolog.assertz(f"glitter([{x},{y}])")
+        if percepts.stench:
+            self.add_log_entry(f"Sensed: Stench at ({x},{y})")
+        if percepts.glitter:
             self.add_log_entry(f"Sensed: Glitter at ({x},{y})")
         
-    def update_display(self):
-        # Get current game state from Prolog
-        try:
-            agent_loc = list(self.prolog.query("agent_location([X,Y])"))[0]
-            x, y = agent_loc["X"], agent_loc["Y"]
-        except:
+    def notify(self, title, message, error=False, then=None):
+        # Dialogs are shown once the current handler has returned, so game
+        # logic never waits on a modal box. While the agent plays, only the
+        # game-ending messages (those with a follow-up) pop up.
+        if self.agent is not None and then is None:
             return
+        def show():
+            (messagebox.showerror if error else messagebox.showinfo)(title, message)
+            if then is not None:
+                then()
+        self.root.after_idle(show)
         
-        # Update percepts for current location
-        self.update_percepts(x, y)
+    def update_display(self):
+        # Get current game state from the engine
+        x, y = self.world.position
+        percepts = self.world.percepts()
+        self.log_percepts(percepts)
         
         # Get current percepts
-        percepts = []
+        percept_names = []
         percept_colors = []
         
-        if list(self.prolog.query(f"breeze([{x},{y}])")):
-            percepts.append("Breeze")
+        if percepts.breeze:
+            percept_names.append("Breeze")
             percept_colors.append(self.danger_color)
-        if list(self.prolog.query(f"stench([{x},{y}])")):
-            percepts.append("Stench")
+        if percepts.stench:
+            percept_names.append("Stench")
             percept_colors.append(self.danger_color)
-        if list(self.prolog.query(f"glitter([{x},{y}])")):
-            percepts.append("Glitter")
+        if percepts.glitter:
+            percept_names.append("Glitter")
             percept_colors.append(self.gold_color)
         
         # Update percept display
-        if percepts:
-            percept_text = "Percepts: " + ", ".join(percepts)
+        if percept_names:
+            percept_text = "Percepts: " + ", ".join(percept_names)
             color = self.danger_color if self.danger_color in percept_colors else self.gold_color
         else:
             percept_text = "Percepts: Safe"
@@ -284,207 +323,245 @@ class WumpusWorldGUI:
         self.percept_label.config(text=percept_text, fg=color)
         
         # Update Wumpus status
-        wumpus_status = "Wumpus: " + ("Dead" if list(self.prolog.query("wumpus_dead(1)")) else "Alive")
+        wumpus_status = "Wumpus: " + ("Dead" if self.world.wumpus_dead else "Alive")
+        if len(self.world.wumpuses) > 1:
+            wumpus_status = (f"Wumpuses: {len(self.world.live_wumpuses)} of "
+                             f"{len(self.world.wumpuses)} alive")
         self.wumpus_label.config(text=wumpus_status)
         
         # Update score and timer
-        score = list(self.prolog.query("score(S)"))[0]["S"]
-        timer = list(self.prolog.query("timer(T)"))[0]["T"]
-        self.score_label.config(text=f"Score: {score}")
-        self.timer_label.config(text=f"Moves: {timer}")
-        
-        # Reset all cells
-        for (cell_x, cell_y), button in self.cells.items():
-            button.config(
-                bg=self.cell_bg,
-                text="",
-                relief=tk.RAISED,
-                highlightbackground="#bdbdbd",
-                highlightcolor="#bdbdbd",
-                highlightthickness=2
-            )
-            
-            # Current agent position
-            if cell_x == x and cell_y == y:
-                button.config(
-                    bg=self.agent_color,
-                    text="Agent",
-                    relief=tk.SUNKEN,
-                    highlightbackground="#0288d1",
-                    highlightcolor="#0288d1",
-                    highlightthickness=3
-                )
-            # Gold in current cell
-            elif cell_x == x and cell_y == y and list(self.prolog.query(f"gold_location([{x},{y}])")) and not list(self.prolog.query("has_gold(1)")):
-                button.config(
-                    bg=self.gold_color,
-                    text="Gold",
-                    highlightbackground="#ffc400",
-                    highlightcolor="#ffc400",
-                    highlightthickness=3
-                )
-        
-        # Highlight adjacent cells
-        adjacent = list(self.prolog.query(f"adjacent([{x},{y}], [A,B])"))
-        for adj in adjacent:
-            adj_x, adj_y = adj["A"], adj["B"]
-            if (adj_x, adj_y) in self.cells:
-                # Only highlight if it's not the current agent position
-                if not (adj_x == x and adj_y == y):
-                    self.cells[(adj_x, adj_y)].config(
-                        bg=self.safe_color,
-                        highlightbackground="#66bb6a",
-                        highlightcolor="#66bb6a",
-                        highlightthickness=2
-                    )
+        self.score_label.config(text=f"Score: {self.world.score}")
+        self.timer_label.config(text=f"Moves: {self.world.timer}")
+        
+        # Work out how every non-default cell should look, then redraw only
+        # the cells whose style changed since the last frame
+        wanted = {(x, y): self.agent_style}
+        for cell in self.world.neighbors(x, y):
+            wanted[cell] = self.adjacent_style
+        
+        # Show the autoplay agent's pit/wumpus estimates on the frontier
+        for cell, (pit, wumpus) in getattr(self.agent, "probabilities", {}).items():
+            if cell != (x, y):
+                style = wanted.get(cell, self.default_style)
+                wanted[cell] = style._replace(text=f"P {pit:.2f}\nW {wumpus:.2f}")
+        
+        for cell in self.board.styled - wanted.keys():
+            self.board.draw(cell, self.default_style)
+        for cell, style in wanted.items():
+            self.board.draw(cell, style)
     
+    def click_cell(self, x, y):
+        # A board click aims the arrow after Shoot Arrow, walks to a distant
+        # square, or else moves to a neighbouring one
+        if self.aiming:
+            self.aim_at(x, y)
+        elif (x, y) != self.world.position and not self.world.is_adjacent(self.world.position, (x, y)):
+            self.walk_to(x, y)
+        else:
+            self.make_move(x, y)
+        
     def make_move(self, x, y):
-        # Get current agent location
-        agent_loc = list(self.prolog.query("agent_location([X,Y])"))[0]
-        ax, ay = agent_loc["X"], agent_loc["Y"]
-        
-        # Check if the clicked cell is adjacent to current position
-        adjacent = list(self.prolog.query(f"adjacent([{ax},{ay}], [{x},{y}])"))
-        if not adjacent:
-            messagebox.showerror("Invalid Move", "You can only move to adjacent squares!")
+        px, py = self.world.position
+        self.history.append(self.world.snapshot())
+        event = self.world.move_to(x, y)
+        if event == "invalid_move":
+            self.history.pop()
+            self.notify("Invalid Move", "You can only move to adjacent squares!", error=True)
             return
-        
-        # Execute the move
-        self.prolog.retractall(f"agent_location([{ax},{ay}])")
-        self.prolog.assertz(f"agent_location([{x},{y}])")
+        self.record(next(name for name, delta in DIRECTIONS.items() if delta == (x - px, y - py)),
+                    undoable=True)
         self.add_log_entry(f"Moved to ({x},{y})")
         
-        # Update timer and score
-        timer = list(self.prolog.query("timer(T)"))[0]["T"]
-        self.prolog.retractall("timer(_)")
-        self.prolog.assertz(f"timer({timer + 1})")
-        
-        score = list(self.prolog.query("score(S)"))[0]["S"]
-        self.prolog.retractall("score(_)")
-        self.prolog.assertz(f"score({score - 1})")
-        
         # Check for pit
-        if list(self.prolog.query(f"pit_location([{x},{y}])")):
-            self.cells[(x, y)].config(
-                bg="black",
-                fg="white",
-                text="Pit",
-                highlightbackground="#000000",
-                highlightcolor="#000000"
-            )
+        if event == "pit":
+            self.board.draw((x, y), self.pit_style)
             self.add_log_entry("Fell into a pit! Game over.")
-            messagebox.showinfo("Game Over", "You fell into a pit! Game over.")
-            self.root.destroy()
+            self.notify("Game Over", "You fell into a pit! Game over.", then=self.root.destroy)
             return
             
         # Check for wumpus
-        if list(self.prolog.query(f"wumpus_location([{x},{y}])")) and not list(self.prolog.query("wumpus_dead(1)")):
-            self.cells[(x, y)].config(
-                bg="red",
-                text="Wumpus",
-                highlightbackground="#d32f2f",
-                highlightcolor="#d32f2f"
-            )
+        if event == "wumpus":
+            self.board.draw((x, y), self.wumpus_style)
             self.add_log_entry("Eaten by Wumpus! Game over.")
-            messagebox.showinfo("Game Over", "You were eaten by the Wumpus! Game over.")
-            self.root.destroy()
+            self.notify("Game Over", "You were eaten by the Wumpus! Game over.", then=self.root.destroy)
             return
         
         self.update_display()
         
-    def shoot_arrow(self):
-        # Get current location
-        agent_loc = list(self.prolog.query("agent_location([X,Y])"))[0]
-        x, y = agent_loc["X"], agent_loc["Y"]
-        
-        # Get possible directions to shoot
-        directions = []
-        if x < 4: directions.append(("right", [x+1, y]))
-        if x > 1: directions.append(("left", [x-1, y]))
-        if y < 4: directions.append(("up", [x, y+1]))
-        if y > 1: directions.append(("down", [x, y-1]))
-        
-        # Ask user for direction
-        direction = simpledialog.askstring("Shoot Arrow", 
-                                        f"Enter direction to shoot ({', '.join([d[0] for d in directions])}):")
-        
-        if direction and direction.lower() in [d[0] for d in directions]:
-            target = [d[1] for d in directions if d[0] == direction.lower()][0]
-            wumpus_loc = list(self.prolog.query("wumpus_location([X,Y])"))[0]
-            
-            if target == [wumpus_loc["X"], wumpus_loc["Y"]]:
+    def walk_to(self, x, y):
+        # Clicking a distant square walks there over visited squares, one
+        # undoable move at a time
+        self.aiming = False
+        route = self.world.route_to((x, y))
+        if not route:
+            self.notify("No Route", "There is no known safe route to that square!", error=True)
+            return
+        for cell in route:
+            self.make_move(*cell)
+            if self.world.done:
+                break
+        
+    def shoot_arrow(self, direction=None):
+        if not self.world.has_arrow:
+            self.add_log_entry("Tried to shoot but the arrow is gone!")
+            self.notify("No Arrow", "You have already used your only arrow!")
+            return
+        
+        # Without a direction, the next board click picks one
+        if direction is None:
+            self.aiming = True
+            self.add_log_entry("Aiming: click a square in your row or column")
+            return
+        
+        # The arrow flies along the whole row or column
+        x, y = self.world.position
+        directions = [name for name, (dx, dy) in DIRECTIONS.items()
+                      if self.world.in_bounds(x + dx, y + dy)]
+        if direction.lower() in directions:
+            self.history.append(self.world.snapshot())
+            event = self.world.shoot(direction.lower())
+            self.record(f"shoot_{direction.lower()}", undoable=True)
+            if event == "killed_wumpus":
                 self.add_log_entry("Shot arrow and killed Wumpus!")
-                messagebox.showinfo("Success!", "You killed the Wumpus!")
-                self.prolog.retractall("wumpus_dead(_)")
-                self.prolog.assertz("wumpus_dead(1)")
-                self.update_display()
+                self.notify("Success!", "You killed the Wumpus!")
             else:
                 self.add_log_entry("Shot arrow and missed!")
-                messagebox.showinfo("Missed", "Your arrow missed the Wumpus!")
-                # Deduct points for shooting
-                score = list(self.prolog.query("score(S)"))[0]["S"]
-                self.prolog.retractall("score(_)")
-                self.prolog.assertz(f"score({score - 10})")
-                self.update_display()
+                self.notify("Missed", "Your arrow missed the Wumpus!")
+            self.update_display()
+    
+    def aim_at(self, x, y):
+        self.aiming = False
+        px, py = self.world.position
+        if (x == px) == (y == py):
+            self.notify("Can't Shoot There", "Click a square in the same row or column as the agent!",
+                        error=True)
+            return
+        step = ((x > px) - (x < px), (y > py) - (y < py))
+        self.shoot_arrow(next(name for name, delta in DIRECTIONS.items() if delta == step))
     
     def grab_gold(self):
-        agent_loc = list(self.prolog.query("agent_location([X,Y])"))[0]
-        x, y = agent_loc["X"], agent_loc["Y"]
-        
-        if list(self.prolog.query(f"gold_location([{x},{y}])")) and not list(self.prolog.query("has_gold(1)")):
-            self.prolog.retractall("has_gold(_)")
-            self.prolog.assertz("has_gold(1)")
-            self.prolog.retractall(f"glitter([{x},{y}])")
-            
-            # Update score
-            score = list(self.prolog.query("score(S)"))[0]["S"]
-            self.prolog.retractall("score(_)")
-            self.prolog.assertz(f"score({score + 500})")
-            
+        snapshot = self.world.snapshot()
+        event = self.world.grab()
+        self.record("grab", undoable=event == "grabbed_gold")
+        if event == "grabbed_gold":
+            self.history.append(snapshot)
             self.add_log_entry("Gold grabbed!")
-            messagebox.showinfo("Success!", "You've grabbed the gold! Now return to (1,1) to climb out.")
+            self.notify("Success!", "You've grabbed the gold! Now return to (1,1) to climb out.")
             self.update_display()
         else:
             self.add_log_entry("Tried to grab gold but none here!")
-            messagebox.showinfo("No Gold", "There's no gold here to grab!")
+            self.notify("No Gold", "There's no gold here to grab!")
     
     def climb_out(self):
-        agent_loc = list(self.prolog.query("agent_location([X,Y])"))[0]
-        x, y = agent_loc["X"], agent_loc["Y"]
-        
-        if x == 1 and y == 1:
-            if list(self.prolog.query("has_gold(1)")):
-                score = list(self.prolog.query("score(S)"))[0]["S"]
-                self.add_log_entry(f"Climbed out with gold! Final score: {score}")
-                messagebox.showinfo("You Win!", f"You've successfully climbed out with the gold! Final score: {score}")
-                self.root.destroy()
-            else:
-                self.add_log_entry("Tried to climb out without gold!")
-                messagebox.showinfo("No Gold", "You need to have the gold to climb out!")
+        event = self.world.climb()
+        self.record("climb")
+        if event == "won":
+            score = self.world.score
+            self.add_log_entry(f"Climbed out with gold! Final score: {score}")
+            self.notify("You Win!", f"You've successfully climbed out with the gold! Final score: {score}",
+                        then=self.root.destroy)
+        elif event == "climb_without_gold":
+            self.add_log_entry("Tried to climb out without gold!")
+            self.notify("No Gold", "You need to have the gold to climb out!")
         else:
             self.add_log_entry("Tried to climb out from wrong location!")
-            messagebox.showinfo("Wrong Location", "You can only climb out at the starting position (1,1)!")
+            self.notify("Wrong Location", "You can only climb out at the starting position (1,1)!")
+        
+    def start_autoplay(self):
+        if self.agent is not None:
+            return
+        if len(self.world.wumpuses) > 1:
+            self.notify("Autoplay Unavailable", "The agent can only play worlds with a single wumpus!")
+            return
+        # The agent thinks on a worker thread; the engine is only ever
+        # touched here on the Tk thread, which polls for the agent's answers
+        self.aiming = False
+        self.agent = self.agent_factory(self.world.size)
+        # Autoplay may start mid-game, after manual moves or an undo
+        self.agent.catch_up(self.world)
+        self.worker = AgentWorker(self.agent)
+        self.add_log_entry("Autoplay started")
+        self.request_action(self.worker)
+        self.root.after(POLL_INTERVAL, self.poll_agent, self.worker)
+        
+    def stop_autoplay(self):
+        if self.worker is not None:
+            self.worker.cancel()
+        self.agent = None
+        self.worker = None
+        if hasattr(self, "agent_label") and self.agent_label.winfo_exists():
+            self.agent_label.config(text="")
+        
+    def request_action(self, worker):
+        if worker is self.worker and not self.world.done:
+            self.agent_label.config(text="Agent: thinking...")
+            worker.ask(self.world.position, self.world.percepts())
+        
+    def poll_agent(self, worker):
+        # Drain the worker's queue; a cancelled worker's messages are dropped
+        if worker is not self.worker:
+            return
+        for message in worker.poll():
+            if message[0] == "progress":
+                _, stage, done, total = message
+                self.agent_label.config(text=f"Agent: {stage} {done + 1}/{total}")
+            elif message[0] == "error":
+                self.add_log_entry(f"Agent failed: {message[1]}")
+                self.stop_autoplay()
+                return
+            else:
+                self.apply_agent_action(message[1])
+                if worker is not self.worker:
+                    return
+        self.root.after(POLL_INTERVAL, self.poll_agent, worker)
+        
+    def apply_agent_action(self, action):
+        if action is None:
+            self.add_log_entry("Agent found no safe move, autoplay stopped")
+            self.stop_autoplay()
+            return
+        self.agent_label.config(text=f"Agent: {action}")
+        
+        # Drive the same handlers as the buttons and board clicks
+        if action in DIRECTIONS:
+            dx, dy = DIRECTIONS[action]
+            x, y = self.world.position
+            self.make_move(x + dx, y + dy)
+        elif action.startswith("shoot_"):
+            self.shoot_arrow(action[len("shoot_"):])
+        elif action == "grab":
+            self.grab_gold()
+        elif action == "climb":
+            self.climb_out()
+        
+        if self.world.done:
+            self.stop_autoplay()
+        else:
+            self.root.after(self.autoplay_delay, self.request_action, self.worker)
+        
+    def undo_move(self):
+        if not self.history:
+            self.add_log_entry("Nothing to undo")
+            return
+        # The autoplay agent's knowledge base cannot be rolled back
+        self.aiming = False
+        self.stop_autoplay()
+        self.world.restore(self.history.pop())
+        self.record("undo")
+        self.add_log_entry("Undid last action")
+        self.update_display()
         
     def restart_game(self):
-        # Reinitialize the game
-        self.prolog.retractall("breeze(_)")
-        self.prolog.retractall("stench(_)")
-        self.prolog.retractall("glitter(_)")
-        self.prolog.retractall("agent_location(_)")
-        self.prolog.retractall("timer(_)")
-        self.prolog.retractall("score(_)")
-        self.prolog.retractall("wumpus_final_location(_)")
-        self.prolog.retractall("has_gold(_)")
-        self.prolog.retractall("wumpus_dead(_)")
-        
-        self.prolog.assertz("agent_location([1,1])")
-        self.prolog.assertz("wumpus_final_location([-1,-1])")
-        self.prolog.assertz("score(30)")
-        self.prolog.assertz("timer(0)")
-        self.prolog.assertz("has_gold(0)")
-        self.prolog.assertz("wumpus_dead(0)")
-        
-        self.action_log = []
+        # Reinitialize the game from the initial snapshot, abandoning
+        # whatever the autoplay agent is still working on
+        self.stop_autoplay()
+        self.aiming = False
+        self.history = []
+        self.world.reset()
+        self.record("reset")
+        
+        self.action_log.clear()
+        self.pending_log = []
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
         self.log_text.config(state=tk.DISABLED)
@@ -499,9 +576,9 @@ class WumpusWorldGUI:
         rules_window.configure(bg=self.bg_color)
         
         # Rules text
-        rules_text = """🌍 Wumpus World Game Rules 🌍
+        rules_text = f"""🌍 Wumpus World Game Rules 🌍
 
-1. The world is a 4x4 grid
+1. The world is a {self.size}x{self.size} grid
 2. You start at (1,1) facing right
 3. Dangers:
    - Wumpus: Kills you if you enter its room (stench nearby)
@@ -509,7 +586,7 @@ class WumpusWorldGUI:
 4. Goal: Find the gold and return to (1,1) to win
 5. Actions:
    - Move to adjacent squares
-   - Shoot arrow (one direction, costs 10 points)
+   - Shoot arrow along a row or column (costs 10 points)
    - Grab gold when you find it
    - Climb out at (1,1) with gold to win
 
@@ -535,6 +612,22 @@ class WumpusWorldGUI:
             self.root.destroy()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Wumpus World.")
+    parser.add_argument("--record", metavar="PATH", help="record every action for replay.py")
+    parser.add_argument("--size", type=int, default=GRID_SIZE,
+                        help=f"board size; other than {GRID_SIZE} plays a random layout")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="layout seed for --size (default: a new layout every game)")
+    args = parser.parse_args()
+    world_factory = None
+    if args.size != GRID_SIZE:
+        if args.size < 2:
+            parser.error("--size must be at least 2")
+        from prolog_world import PrologWumpusWorld
+        def world_factory(size):
+            return PrologWumpusWorld(**random_layout(args.seed, size))
     root = tk.Tk()
-    game = WumpusWorldGUI(root)
+    game = WumpusWorldGUI(root, world_factory, args.size, replay_path=args.record)
     root.mainloop()
+    if game.recorder is not None:
+        game.recorder.close()
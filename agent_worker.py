@@ -0,0 +1,61 @@
+import queue
+import threading
+
+
+class Cancelled(Exception):
+    pass
+
+
+class AgentWorker:
+    # Runs an agent's next_action() on a daemon thread so a slow decision
+    # never blocks the caller (the Tk mainloop). ask() hands over the current
+    # position and percepts; answers and progress come back on `results` as
+    # ("progress", stage, done, total), ("action", action) or ("error", exc)
+    # and are drained by the UI thread with poll().
+    #
+    # cancel() stops the thread at the agent's next progress report, and
+    # anything it still posts goes to a queue nobody reads any more.
+    def __init__(self, agent):
+        self.agent = agent
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.cancelled = threading.Event()
+        agent.progress = self.report
+        self.thread = threading.Thread(target=self.run, name="agent-worker", daemon=True)
+        self.thread.start()
+
+    def ask(self, position, percepts):
+        self.requests.put((position, percepts))
+
+    def cancel(self):
+        self.cancelled.set()
+        self.requests.put(None)
+
+    def report(self, stage, done, total):
+        # Called by the agent from the worker thread while it reasons
+        if self.cancelled.is_set():
+            raise Cancelled
+        self.results.put(("progress", stage, done, total))
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            if request is None or self.cancelled.is_set():
+                return
+            try:
+                action = self.agent.next_action(*request)
+            except Cancelled:
+                return
+            except Exception as exc:
+                self.results.put(("error", exc))
+                return
+            self.results.put(("action", action))
+
+    def poll(self):
+        # Every message posted since the last poll, without blocking
+        messages = []
+        while True:
+            try:
+                messages.append(self.results.get_nowait())
+            except queue.Empty:
+                return messages
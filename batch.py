@@ -0,0 +1,165 @@
+import json
+import os
+import random
+import sys
+import time
+
+from logical_agent import LogicalAgent, ProbabilisticAgent, run_episode
+from wumpus_engine import ACTIONS, GRID_SIZE, PIT_DENSITY, WumpusWorld, random_layout
+
+
+class RandomAgent:
+    # Baseline policy: uniformly random actions, reproducible per seed
+    def __init__(self, size, seed=None):
+        self.rng = random.Random(seed)
+
+    def next_action(self, position, percepts):
+        return self.rng.choice(ACTIONS)
+
+
+POLICIES = {
+    "logical": LogicalAgent,
+    "probabilistic": ProbabilisticAgent,
+    "random": RandomAgent,
+}
+
+# Per-process state, set up once by init_worker
+_worker = {}
+
+
+def init_worker(policy, size, pit_density, max_steps, worlds=None):
+    _worker["policy"] = POLICIES[policy]
+    _worker["size"] = size
+    _worker["pit_density"] = pit_density
+    _worker["max_steps"] = max_steps
+    # Any valid layout will do; play() loads each episode's own
+    _worker["world"] = WumpusWorld(**random_layout(0, size, pit_density))
+    # With a world store, "seeds" are row numbers into the memory-mapped file
+    _worker["store"] = None
+    if worlds is not None:
+        from world_store import open_store
+        _worker["store"] = open_store(worlds)
+
+
+def play(seed):
+    world = _worker["world"]
+    store = _worker["store"]
+    if store is None:
+        layout = random_layout(seed, _worker["size"], _worker["pit_density"])
+    else:
+        from world_store import record_layout
+        record = store[seed]
+        layout = record_layout(record)
+        seed = int(record["seed"])
+    world.set_layout(layout["size"], layout["gold"], layout["wumpus"], layout["pits"])
+    world.reset()
+    policy = _worker["policy"]
+    agent = policy(world.size, seed) if policy is RandomAgent else policy(world.size)
+
+    start = time.perf_counter()
+    run_episode(world, agent, _worker["max_steps"])
+    return {
+        "seed": seed,
+        "outcome": world.outcome or "gave_up",
+        "score": world.score,
+        "moves": world.timer,
+        "wall_time": time.perf_counter() - start,
+    }
+
+
+def play_chunk(seeds):
+    return [play(seed) for seed in seeds]
+
+
+def chunks(start, stop, size):
+    for first in range(start, stop, size):
+        yield range(first, min(first + size, stop))
+
+
+def run_batch(out, seeds, policy="probabilistic", size=GRID_SIZE, pit_density=PIT_DENSITY,
+              workers=None, chunk_size=200, max_steps=None, worlds=None):
+    # Play every seed in `seeds` (a range) and stream one JSON line per
+    # episode to `out` as chunks finish. Only a bounded number of chunks is
+    # in flight at any time, so memory stays flat however many seeds are run.
+    # With `worlds` (a world_store file), `seeds` are rows of that store.
+    # The pool machinery is imported here so that workers and modules that
+    # only want play_chunk() or chunks() start without it.
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    stats = {"episodes": 0, "wins": 0, "score": 0}
+    start = time.perf_counter()
+    pending = set()
+    todo = chunks(seeds.start, seeds.stop, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(policy, size, pit_density, max_steps, worlds)) as pool:
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = next(todo, None)
+                if chunk is None:
+                    break
+                pending.add(pool.submit(play_chunk, chunk))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    out.write(json.dumps(result) + "\n")
+                    stats["episodes"] += 1
+                    stats["wins"] += result["outcome"] == "won"
+                    stats["score"] += result["score"]
+            out.flush()
+
+    stats["wall_time"] = time.perf_counter() - start
+    return stats
+
+
+def parse_seeds(text):
+    # "1000" -> 0..999, "100:200" -> 100..199
+    if ":" in text:
+        first, last = text.split(":", 1)
+        return range(int(first), int(last))
+    return range(int(text))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Play many seeded Wumpus worlds headless.")
+    parser.add_argument("--seeds", type=parse_seeds, default=None,
+                        help="seed range, either N or START:STOP (default 1000)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="probabilistic")
+    parser.add_argument("--size", type=int, default=GRID_SIZE)
+    parser.add_argument("--pit-density", type=float, default=PIT_DENSITY)
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--max-steps", type=int, default=None)
+    parser.add_argument("--worlds", metavar="PATH",
+                        help="play worlds from a world_store.py file; --seeds are then rows (default all)")
+    parser.add_argument("--out", default="results.jsonl")
+    args = parser.parse_args(argv)
+
+    seeds = args.seeds
+    if args.worlds is not None:
+        from world_store import open_store
+        rows = len(open_store(args.worlds))
+        seeds = range(rows) if seeds is None else range(seeds.start, min(seeds.stop, rows))
+    elif seeds is None:
+        seeds = range(1000)
+
+    with open(args.out, "w") as out:
+        stats = run_batch(out, seeds, args.policy, args.size, args.pit_density,
+                          args.workers, args.chunk_size, args.max_steps, args.worlds)
+
+    episodes = stats["episodes"]
+    if episodes:
+        print(f"{episodes} episodes in {stats['wall_time']:.2f}s "
+              f"({episodes / stats['wall_time']:.0f} episodes/s)")
+        print(f"win rate {stats['wins'] / episodes:.1%}, "
+              f"mean score {stats['score'] / episodes:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
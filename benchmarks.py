@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from wumpus_engine import WumpusWorld
+
+SIZES = (4, 16, 64, 256)
+TOLERANCE = 0.25  # slowdown over the baseline median that counts as a regression
+
+# Headless entry points, and what none of them may pull in
+HEADLESS_MODULES = ("wumpus_engine", "logical_agent", "batch", "oracle")
+GUI_MODULES = ("tkinter", "pyswip", "PIL", "numpy")
+# Median cold import time any headless module may take, as a multiple of the
+# start-up time of a bare interpreter (`python -c pass`) on the same host, so
+# the check holds on slow machines too. They take 0.5-1.5x today; NumPy alone
+# takes about 5x.
+IMPORT_BUDGET = 3.0
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(' '.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def make_factory(backend, prolog=None):
+    if backend == "prolog":
+        from prolog_world import PrologWumpusWorld
+        return lambda **layout: PrologWumpusWorld(prolog=prolog, **layout)
+    return WumpusWorld
+
+
+def safe_layout(size):
+    # No pits, gold in the far corner, wumpus out of the way of the script
+    # but in line with the start
+    return {"size": size, "gold": (size, size), "wumpus": (1, size), "pits": ()}
+
+
+def episode_script(size):
+    return (["right"] * (size - 1) + ["up"] * (size - 1) + ["grab"]
+            + ["down"] * (size - 1) + ["left"] * (size - 1) + ["climb"])
+
+
+def timings(fn, repeat, number):
+    # Seconds per call for `repeat` samples of `number` calls each
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    median = statistics.median(ordered)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {"median": median, "p95": p95, "ops_per_sec": 1 / median if median else float("inf")}
+
+
+def benchmarks(factory, size):
+    # name -> zero-argument callable timing one operation
+    layout = safe_layout(size)
+    world = factory(**layout)
+
+    def setup():
+        factory(**layout).close()
+
+    def move():
+        x, y = world.position
+        world.move_to(2 if x == 1 else 1, y)
+
+    def percepts():
+        world.percepts()
+
+    def restart():
+        world.reset()
+
+    state = world.snapshot()
+
+    def restore():
+        world.restore(state)
+
+    def shoot():
+        # The wumpus sits at the far end of the agent's column
+        world.restore(state)
+        world.shoot("up")
+
+    script = episode_script(size)
+
+    def episode():
+        world.reset()
+        for action in script:
+            world.step(action)
+        assert world.outcome == "won"
+
+    return {"setup": setup, "move": move, "percepts": percepts,
+            "restart": restart, "restore": restore, "shoot": shoot, "episode": episode}
+
+
+def run(backend="python", sizes=SIZES, repeat=21, number=None, prolog=None):
+    factory = make_factory(backend, prolog)
+    results = {}
+    for size in sizes:
+        for name, fn in benchmarks(factory, size).items():
+            calls = number or (5 if name in ("setup", "episode") else 200)
+            results[f"{backend}/{size}/{name}"] = summarize(timings(fn, repeat, calls))
+    return results
+
+
+def import_times(modules=HEADLESS_MODULES, repeat=21):
+    # Cold import time of each module in a fresh interpreter, as a process
+    # pool worker pays it, and the start-up time of a bare interpreter to
+    # judge it by; also returns the GUI/Prolog modules each module loaded
+    here = os.path.dirname(os.path.abspath(__file__))
+    results, leaks = {}, {}
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], cwd=here, check=True)
+        samples.append(time.perf_counter() - start)
+    results["import/startup"] = summarize(samples)
+    for module in modules:
+        probe = IMPORT_PROBE.format(module=module, heavy=GUI_MODULES)
+        samples = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, "-c", probe], cwd=here, check=True,
+                                    capture_output=True, text=True).stdout.split("\n")
+            samples.append(float(output[0]))
+            if output[1]:
+                leaks[module] = output[1].split()
+        results[f"import/{module}"] = summarize(samples)
+    return results, leaks
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    regressions = []
+    for key, stats in results.items():
+        if key in baseline and stats["median"] > baseline[key]["median"] * (1 + tolerance):
+            regressions.append((key, baseline[key]["median"], stats["median"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Wumpus World engine headless.")
+    parser.add_argument("--backend", choices=("python", "prolog"), default="python")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=21)
+    parser.add_argument("--number", type=int, default=None, help="calls per sample")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--no-imports", action="store_true",
+                        help="skip the import time benchmarks")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET,
+                        help="fail if a headless module takes longer to import than this "
+                             "many bare interpreter start-ups")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="prolog backend: write a per-query pstats dump and print a report")
+    args = parser.parse_args(argv)
+
+    prolog = None
+    if args.profile:
+        from prolog_profiler import InstrumentedProlog
+        prolog = InstrumentedProlog()
+
+    results = run(args.backend, args.sizes, args.repeat, args.number, prolog)
+    leaks, over_budget = {}, []
+    if not args.no_imports:
+        imports, leaks = import_times(repeat=args.repeat)
+        results.update(imports)
+        startup = imports.pop("import/startup")["median"]
+        over_budget = [(key, stats["median"]) for key, stats in imports.items()
+                       if stats["median"] > args.import_budget * startup]
+    for key, stats in results.items():
+        print(f"{key:<28} median {stats['median'] * 1e6:10.1f} us   "
+              f"p95 {stats['p95'] * 1e6:10.1f} us   {stats['ops_per_sec']:12.0f} ops/s")
+
+    if prolog is not None:
+        print(prolog.report(limit=20))
+        prolog.dump_stats(args.profile)
+
+    for module, heavy in leaks.items():
+        print(f"HEADLESS IMPORT {module} loaded {', '.join(heavy)}")
+    for key, median in over_budget:
+        print(f"OVER BUDGET {key}: {median * 1e3:.1f} ms > {args.import_budget:g} x "
+              f"{startup * 1e3:.1f} ms interpreter start-up")
+
+    with open(args.out, "w") as out:
+        json.dump({"python": platform.python_version(), "results": results}, out, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before * 1e6:.1f} us -> {after * 1e6:.1f} us")
+        if regressions:
+            return 1
+    return 1 if leaks or over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
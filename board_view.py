@@ -0,0 +1,107 @@
+import tkinter as tk
+from collections import namedtuple
+
+CellStyle = namedtuple("CellStyle", ["bg", "text", "relief", "highlight", "thickness", "fg"])
+
+# Boards bigger than this are drawn on a single canvas instead of buttons
+CANVAS_THRESHOLD = 16
+
+
+class ButtonBoard:
+    # One tk.Button per cell. Every cell remembers the style it was last drawn
+    # with and draw() only calls config() when that style actually changes.
+    def __init__(self, parent, size, on_click, default, style_button):
+        self.default = default
+        self.state = {}
+        self.cells = {}
+        for y in range(size, 0, -1):  # Rows from top to bottom
+            for x in range(1, size + 1):
+                cell = tk.Button(parent, text="", width=8, height=4,
+                               font=('Poppins', 10), relief=tk.RAISED, bd=2,
+                               command=lambda x=x, y=y: on_click(x, y))
+                cell.grid(row=size-y, column=x-1, padx=5, pady=5)
+                self.cells[(x, y)] = cell
+                style_button(cell)
+
+    @property
+    def styled(self):
+        # Cells currently drawn with something other than the default style
+        return set(self.state)
+
+    def draw(self, cell, style):
+        if self.state.get(cell, self.default) == style:
+            return
+        if style == self.default:
+            self.state.pop(cell, None)
+        else:
+            self.state[cell] = style
+        self.cells[cell].config(
+            bg=style.bg,
+            fg=style.fg,
+            text=style.text,
+            relief=style.relief,
+            highlightbackground=style.highlight,
+            highlightcolor=style.highlight,
+            highlightthickness=style.thickness
+        )
+
+
+class CanvasBoard:
+    # Large boards: one canvas with a rectangle item per cell and text items
+    # created only for cells that ever show text. Same draw() contract as
+    # ButtonBoard.
+    def __init__(self, parent, size, on_click, default, bg):
+        self.size = size
+        self.default = default
+        self.state = {}
+        self.texts = {}
+        self.pixels = max(6, min(48, 640 // size))
+        side = self.pixels * size
+        self.canvas = tk.Canvas(parent, width=side, height=side, bg=bg,
+                                highlightthickness=0)
+        self.canvas.pack()
+        self.rects = {}
+        for y in range(size, 0, -1):
+            for x in range(1, size + 1):
+                left, top = self.corner(x, y)
+                self.rects[(x, y)] = self.canvas.create_rectangle(
+                    left, top, left + self.pixels, top + self.pixels,
+                    fill=default.bg, outline=default.highlight, width=1)
+        self.canvas.bind("<Button-1>", lambda e: self.click(e, on_click))
+
+    def corner(self, x, y):
+        return (x - 1) * self.pixels, (self.size - y) * self.pixels
+
+    def click(self, event, on_click):
+        x = event.x // self.pixels + 1
+        y = self.size - event.y // self.pixels
+        if 1 <= x <= self.size and 1 <= y <= self.size:
+            on_click(x, y)
+
+    @property
+    def styled(self):
+        return set(self.state)
+
+    def draw(self, cell, style):
+        old = self.state.get(cell, self.default)
+        if old == style:
+            return
+        if style == self.default:
+            self.state.pop(cell, None)
+        else:
+            self.state[cell] = style
+        if (old.bg, old.highlight) != (style.bg, style.highlight):
+            self.canvas.itemconfig(self.rects[cell], fill=style.bg, outline=style.highlight)
+        if old.text != style.text or old.fg != style.fg:
+            if cell not in self.texts:
+                left, top = self.corner(*cell)
+                half = self.pixels // 2
+                self.texts[cell] = self.canvas.create_text(
+                    left + half, top + half, font=('Poppins', max(5, self.pixels // 5)))
+            self.canvas.itemconfig(self.texts[cell], text=style.text, fill=style.fg)
+
+
+def create_board(parent, size, on_click, default, style_button, bg):
+    if size > CANVAS_THRESHOLD:
+        return CanvasBoard(parent, size, on_click, default, bg)
+    return ButtonBoard(parent, size, on_click, default, style_button)
@@ -0,0 +1,294 @@
+from collections import deque
+
+from planner import DistanceField, grid_neighbors
+from probability import frontier_probabilities
+from sat_solver import SatSolver
+from wumpus_engine import DIRECTIONS, PIT_DENSITY, START
+
+
+class LogicalAgent:
+    # Autoplay agent that keeps a propositional knowledge base of pit and
+    # wumpus clauses in an incremental SAT solver and only walks into squares
+    # the knowledge base proves safe.
+    #
+    # Clauses are added once per newly visited square and only the unknown
+    # squares on the frontier are ever queried, so per-step inference depends
+    # on the size of the frontier, not on how much of the board is explored.
+    #
+    # The clauses (and ProbabilisticAgent's estimates) assume a single
+    # wumpus; run_episode refuses worlds with more.
+    def __init__(self, size):
+        self.size = size
+        self.kb = SatSolver()
+        self.pit_vars = {}
+        self.wumpus_vars = {}
+        # Variable -> square, to read hazards back out of a model
+        self.pit_cells = {}
+        self.wumpus_cells = {}
+        self.visited = set()
+        self.breezy = set()
+        self.smelly = set()
+        self.safe = {START}
+        # Way back to the exit, extended as squares are proven safe
+        self.home = DistanceField(size, START, self.safe)
+        self.frontier = set()
+        self.wumpus_candidates = set()
+        self.known_wumpus = None
+        self.has_gold = False
+        self.has_arrow = True
+        self.wumpus_dead = False
+        self.position = START
+        self.steps = 0
+        self.dirty = True
+        # Optional callback(stage, done, total) for long reasoning steps,
+        # e.g. agent_worker.AgentWorker.report
+        self.progress = None
+
+    def pit(self, cell):
+        if cell not in self.pit_vars:
+            self.pit_vars[cell] = self.kb.new_var()
+            self.pit_cells[self.pit_vars[cell]] = cell
+        return self.pit_vars[cell]
+
+    def wumpus(self, cell):
+        if cell not in self.wumpus_vars:
+            self.wumpus_vars[cell] = self.kb.new_var()
+            self.wumpus_cells[self.wumpus_vars[cell]] = cell
+        return self.wumpus_vars[cell]
+
+    def tell(self, cell, percepts):
+        # Add what a newly visited square says about its neighbours
+        self.dirty = True
+        self.visited.add(cell)
+        self.frontier.discard(cell)
+        self.mark_safe(cell)
+        self.kb.add_clause([-self.pit(cell)])
+
+        near = grid_neighbors(self.size, *cell)
+        self.frontier.update(n for n in near if n not in self.visited)
+
+        if percepts.breeze:
+            self.breezy.add(cell)
+            self.kb.add_clause([self.pit(n) for n in near])
+        else:
+            for n in near:
+                self.kb.add_clause([-self.pit(n)])
+
+        # Once the wumpus is dead the stench is gone for good, and adding
+        # "no stench" clauses would contradict what was learnt before
+        if self.wumpus_dead:
+            return
+        self.kb.add_clause([-self.wumpus(cell)])
+        if percepts.stench:
+            self.smelly.add(cell)
+            self.kb.add_clause([self.wumpus(n) for n in near])
+            # There is a single wumpus, so at most one candidate holds it
+            new = [n for n in near if n not in self.wumpus_candidates]
+            for n in new:
+                for other in self.wumpus_candidates:
+                    self.kb.add_clause([-self.wumpus(n), -self.wumpus(other)])
+                self.wumpus_candidates.add(n)
+        else:
+            for n in near:
+                self.kb.add_clause([-self.wumpus(n)])
+
+    def catch_up(self, world):
+        # Take over a game already in progress: learn what every visited
+        # square shows now, as if the agent had walked there itself. Once the
+        # wumpus is dead its stench is gone, and tell() skips wumpus clauses.
+        self.has_gold = world.has_gold
+        self.has_arrow = world.has_arrow
+        self.wumpus_dead = world.wumpus_dead
+        for cell in world.visited_cells():
+            self.tell(cell, world.percepts_at(*cell))
+        self.position = world.position
+
+    def report(self, stage, done, total):
+        if self.progress is not None:
+            self.progress(stage, done, total)
+
+    def mark_safe(self, cell):
+        self.safe.add(cell)
+        self.home.add(cell)
+
+    def possible(self, lit, hazards=None):
+        # Is `lit` consistent with the knowledge base? The model that shows
+        # it also shows which other squares may hold a hazard; those go into
+        # `hazards` so they need no query of their own.
+        if not self.kb.solve([lit]):
+            return False
+        if hazards is not None:
+            for q in self.kb.model:
+                if q in self.pit_cells:
+                    hazards.add(self.pit_cells[q])
+                elif q in self.wumpus_cells and not self.wumpus_dead:
+                    hazards.add(self.wumpus_cells[q])
+        return True
+
+    def is_safe(self, cell, hazards=None):
+        if cell in self.safe:
+            return True
+        if self.possible(self.pit(cell), hazards):
+            return False
+        if not self.wumpus_dead and self.possible(self.wumpus(cell), hazards):
+            return False
+        self.mark_safe(cell)
+        return True
+
+    def infer(self):
+        # Re-check only the undecided frontier squares, and only when the
+        # knowledge base has changed since the last check
+        if not self.dirty:
+            return
+        self.dirty = False
+        hazards = set()
+        total = len(self.frontier)
+        for done, cell in enumerate(self.frontier):
+            self.report("safety", done, total)
+            if cell not in hazards:
+                self.is_safe(cell, hazards)
+        if self.known_wumpus is None and not self.wumpus_dead:
+            candidates = self.wumpus_candidates & self.frontier
+            ruled_out = set()
+            for done, cell in enumerate(candidates):
+                self.report("wumpus", done, len(candidates))
+                if cell in ruled_out:
+                    continue
+                if not self.kb.solve([-self.wumpus(cell)]):
+                    self.known_wumpus = cell
+                    break
+                ruled_out.update(self.wumpus_cells[-q] for q in self.kb.model
+                                 if -q in self.wumpus_cells)
+
+    def path_to(self, goals):
+        # Shortest route over known-safe squares to any of the goal squares
+        goals = set(goals)
+        if not goals:
+            return None
+        parents = {self.position: None}
+        queue = deque([self.position])
+        while queue:
+            cell = queue.popleft()
+            if cell in goals:
+                path = []
+                while cell != self.position:
+                    path.append(cell)
+                    cell = parents[cell]
+                return path[::-1]
+            for n in grid_neighbors(self.size, *cell):
+                if n not in parents and n in self.safe:
+                    parents[n] = cell
+                    queue.append(n)
+        return None
+
+    def step_towards(self, cell):
+        dx = cell[0] - self.position[0]
+        dy = cell[1] - self.position[1]
+        for name, delta in DIRECTIONS.items():
+            if delta == (dx, dy):
+                return name
+        raise ValueError(f"{cell} is not adjacent to {self.position}")
+
+    def next_action(self, position, percepts):
+        # Update the knowledge base from the current square and pick an action
+        # from the engine's action set, or None when no safe plan is left
+        self.position = position
+        self.steps += 1
+        if percepts.scream:
+            self.wumpus_dead = True
+            self.known_wumpus = None
+            self.dirty = True
+        if position not in self.visited:
+            self.tell(position, percepts)
+        # A contradictory knowledge base entails everything, including that
+        # every square is safe, so stop rather than act on it
+        if not self.kb.ok:
+            return None
+
+        if percepts.glitter and not self.has_gold:
+            self.has_gold = True
+            return "grab"
+
+        if self.has_gold:
+            if position == START:
+                return "climb"
+            path = self.home.path(position)
+            return self.step_towards(path[0]) if path else None
+
+        self.infer()
+        path = self.path_to(c for c in self.safe if c not in self.visited)
+        if path:
+            return self.step_towards(path[0])
+
+        if self.known_wumpus and self.has_arrow:
+            target = self.known_wumpus
+            if target in grid_neighbors(self.size, *position):
+                self.has_arrow = False
+                return "shoot_" + self.step_towards(target)
+            path = self.path_to(n for n in grid_neighbors(self.size, *target) if n in self.visited)
+            if path:
+                return self.step_towards(path[0])
+        return None
+
+
+class ProbabilisticAgent(LogicalAgent):
+    # Logical agent that, when nothing is provably safe, gambles on the
+    # frontier square least likely to hold a pit or the wumpus
+    def __init__(self, size, pit_prior=PIT_DENSITY):
+        super().__init__(size)
+        self.pit_prior = pit_prior
+        self.probabilities = {}
+        self.gamble = None
+
+    def update_probabilities(self):
+        self.report("probabilities", 0, 1)
+        probabilities = frontier_probabilities(
+            self.size, self.visited, self.breezy, self.smelly,
+            self.wumpus_dead, self.pit_prior,
+        )
+        # Squares the knowledge base has already decided override estimates
+        for cell in probabilities:
+            if cell in self.safe:
+                probabilities[cell] = (0.0, 0.0)
+        # Swapped in whole, so the GUI thread never sees a half-built dict
+        self.probabilities = probabilities
+        return probabilities
+
+    def risk(self, cell):
+        pit, wumpus = self.probabilities[cell]
+        return 1 - (1 - pit) * (1 - wumpus)
+
+    def next_action(self, position, percepts):
+        action = super().next_action(position, percepts)
+        if action is not None or self.has_gold:
+            self.gamble = None
+            return action
+
+        if self.gamble is None or self.gamble in self.visited:
+            self.update_probabilities()
+            if not self.probabilities:
+                return None
+            self.gamble = min(self.probabilities, key=lambda c: (self.risk(c), c))
+
+        if self.gamble in grid_neighbors(self.size, *position):
+            return self.step_towards(self.gamble)
+        path = self.path_to(n for n in grid_neighbors(self.size, *self.gamble) if n in self.visited)
+        return self.step_towards(path[0]) if path else None
+
+
+def run_episode(world, agent=None, max_steps=None):
+    # Let an agent play a world until the game ends or the agent gives up
+    if agent is None:
+        agent = LogicalAgent(world.size)
+    if isinstance(agent, LogicalAgent) and len(world.wumpuses) > 1:
+        raise ValueError("LogicalAgent and ProbabilisticAgent play single-wumpus worlds only")
+    max_steps = max_steps or 20 * world.size * world.size
+    percepts = world.percepts()
+    for _ in range(max_steps):
+        action = agent.next_action(world.position, percepts)
+        if action is None:
+            break
+        percepts, _, done = world.step(action)
+        if done:
+            break
+    return world
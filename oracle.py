@@ -0,0 +1,372 @@
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+from planner import DistanceField, grid_neighbors
+from probability import clear_probability, pit_evidence, wumpus_probabilities
+from wumpus_engine import (
+    DIRECTIONS, GOLD_REWARD, GRID_SIZE, MOVE_COST, PIT_DENSITY, SHOOT_COST, START,
+    START_SCORE, WumpusWorld, as_cells, random_layout,
+)
+
+# Best score for one world and the actions that reach it. The oracle plays
+# to win: fetch the gold and climb out, or do nothing when that is impossible.
+Solution = namedtuple("Solution", ["score", "actions"])
+
+MODES = ("full", "belief")
+
+# Largest board the belief search solves exactly in reasonable time; beyond
+# it belief mode needs an explicit --max-depth and is then only a heuristic
+EXACT_SIZE = 3
+
+
+def walk(start, route):
+    # Move actions along a route of adjacent cells
+    actions = []
+    for cell in route:
+        step = (cell[0] - start[0], cell[1] - start[1])
+        actions.append(next(name for name, delta in DIRECTIONS.items() if delta == step))
+        start = cell
+    return actions
+
+
+def firing_lines(size, wumpuses, target):
+    # (cell, direction) pairs from which an arrow hits `target` first
+    x, y = target
+    for name, (dx, dy) in DIRECTIONS.items():
+        cx, cy = x - dx, y - dy
+        while 1 <= cx <= size and 1 <= cy <= size and (cx, cy) not in wumpuses:
+            yield (cx, cy), name
+            cx, cy = cx - dx, cy - dy
+
+
+def full_information(layout):
+    # Optimal play knowing the whole layout: the shortest round trip to the
+    # gold over hazard-free squares, or a shorter one through a wumpus's
+    # square after shooting it
+    size, gold = layout["size"], tuple(layout["gold"])
+    pits = set(map(tuple, layout["pits"]))
+    wumpuses = set(as_cells(layout["wumpus"]))
+    if gold in pits:
+        return Solution(START_SCORE, [])
+    cells = {(x, y) for x in range(1, size + 1) for y in range(1, size + 1)}
+    safe = cells - pits - wumpuses
+
+    plans = []  # (cost, actions)
+    if gold in safe:
+        to_gold = DistanceField(size, gold, safe)
+        if START in to_gold.distance:
+            route = to_gold.path(START)
+            plans.append((2 * MOVE_COST * len(route),
+                          walk(START, route) + ["grab"] + walk(gold, route[::-1][1:] + [START])))
+
+    from_start = DistanceField(size, START, safe)
+    gold_first = DistanceField(size, gold, safe) if gold in safe else None
+    for wumpus in wumpuses - pits:
+        cleared = safe | {wumpus}
+        if gold not in cleared:
+            continue
+        to_gold = DistanceField(size, gold, cleared)
+        home = DistanceField(size, START, cleared)
+        for cell, direction in firing_lines(size, wumpuses, wumpus):
+            # Shoot on the way to the gold ...
+            if cell in from_start.distance and cell in to_gold.distance and START in to_gold.distance:
+                moves = from_start.distance[cell] + to_gold.distance[cell] + to_gold.distance[START]
+                there = from_start.path(cell)[::-1][1:] + [cell] if cell != START else []
+                onward = to_gold.path(cell)
+                back = to_gold.path(START)[::-1][1:] + [START]
+                plans.append((MOVE_COST * moves + SHOOT_COST,
+                              walk(START, there) + ["shoot_" + direction] + walk(cell, onward)
+                              + ["grab"] + walk(gold, back)))
+            # ... or on the way back
+            if gold_first is not None and cell in gold_first.distance and START in gold_first.distance \
+                    and cell in home.distance:
+                moves = gold_first.distance[START] + gold_first.distance[cell] + home.distance[cell]
+                there = gold_first.path(START)
+                onward = gold_first.path(cell)[::-1][1:] + [cell] if cell != gold else []
+                back = home.path(cell)
+                plans.append((MOVE_COST * moves + SHOOT_COST,
+                              walk(START, there) + ["grab"] + walk(gold, onward)
+                              + ["shoot_" + direction] + walk(cell, back)))
+
+    if not plans:
+        return Solution(START_SCORE, [])
+    cost, actions = min(plans, key=lambda plan: plan[0])
+    return Solution(START_SCORE + GOLD_REWARD - cost, actions + ["climb"])
+
+
+# What the agent knows: percepts felt on every visited square, its square,
+# and the arrow: None while unused, True after a scream, otherwise the set of
+# squares it flew over without hitting anything
+Belief = namedtuple("Belief", ["observations", "position", "shot"])
+
+
+class BeliefSolver:
+    # Optimal play without seeing the layout: expectimax over belief states
+    # under the random_layout() prior (uniform gold and wumpus, independent
+    # pits). From a belief the agent either stops, walks over visited
+    # squares into a frontier square (where it dies, finds the gold and walks
+    # home, or feels new percepts), or walks to a visited square and shoots.
+    #
+    # Values are the expected score still to come, which does not depend on
+    # the world actually being played, so the transposition table is shared
+    # by every world the solver sees. Beliefs and their mirror image across
+    # the diagonal through (1,1) share one canonical key.
+    def __init__(self, size=GRID_SIZE, pit_density=PIT_DENSITY, max_depth=None):
+        self.size = size
+        self.prior = pit_density
+        self.max_depth = max_depth
+        self.table = {}
+        self.cells = [(x, y) for y in range(1, size + 1) for x in range(1, size + 1)]
+
+    @staticmethod
+    def key(belief):
+        observations, position, shot = belief
+        missed = shot if isinstance(shot, frozenset) else ()
+        plain = (tuple(sorted(observations)), position, shot is True, tuple(sorted(missed)))
+        flipped = (tuple(sorted(((y, x), b, s) for (x, y), b, s in observations)), position[::-1],
+                   shot is True, tuple(sorted((y, x) for x, y in missed)))
+        return min(plain, flipped)
+
+    def wumpus_candidates(self, belief):
+        # Squares the wumpus may still be in, all equally likely
+        if belief.shot is True:
+            return set()
+        visited = {c for c, _, _ in belief.observations}
+        smelly = {c for c, _, stench in belief.observations if stench}
+        odds = wumpus_probabilities(self.size, visited, smelly, self.cells)
+        missed = belief.shot or set()
+        return {c for c, p in odds.items() if p > 0 and c not in missed}
+
+    def line(self, cell, direction):
+        dx, dy = DIRECTIONS[direction]
+        x, y = cell[0] + dx, cell[1] + dy
+        while 1 <= x <= self.size and 1 <= y <= self.size:
+            yield (x, y)
+            x, y = x + dx, y + dy
+
+    def outcomes(self, visited, evidence, candidates, cell):
+        # (probability, breeze, stench) of surviving a step into `cell`,
+        # and the chance of glitter there; the missing mass is death
+        near = set(grid_neighbors(self.size, *cell)) - visited
+        clear = clear_probability(self.size, visited, None, [cell], self.prior, evidence)
+        calm = clear_probability(self.size, visited, None, near | {cell}, self.prior, evidence)
+        gold = 1 / (len(self.cells) - len(visited))
+        others = len(candidates - {cell})
+        wumpus = (cell in candidates) / len(candidates) if candidates else 0.0
+        survive = clear * (1 - wumpus)
+        if survive <= 0:
+            return [], gold
+        breeze = 1 - calm / clear
+        stench = len(candidates & near) / others if others else 0.0
+        results = []
+        for b, pb in ((True, breeze), (False, 1 - breeze)):
+            for s, ps in ((True, stench), (False, 1 - stench)):
+                if pb * ps > 0:
+                    results.append((survive * pb * ps, b, s))
+        return results, gold
+
+    def value(self, belief, depth=0):
+        # Expected score still to come under optimal play. With a max_depth,
+        # beliefs beyond the horizon are valued as stopping; a table entry
+        # searched at least as deep as needed is reused as it is.
+        remaining = float("inf") if self.max_depth is None else self.max_depth - depth
+        key = self.key(belief)
+        if key in self.table and self.table[key][0] >= remaining:
+            return self.table[key][1]
+        best = 0.0
+        if remaining > 0:
+            for _, gain in self.options(belief, depth):
+                best = max(best, gain)
+        self.table[key] = (remaining, best)
+        return best
+
+    def options(self, belief, depth=0):
+        # (action, expected score still to come) for every macro action:
+        # ("move", frontier square) or ("shoot", visited square, direction)
+        observations, position, shot = belief
+        visited = {c for c, _, _ in observations}
+        breezy = {c for c, breeze, _ in observations if breeze}
+        evidence = pit_evidence(self.size, visited, breezy)
+        candidates = self.wumpus_candidates(belief)
+        near = DistanceField(self.size, position, visited).distance
+        for cell in sorted(evidence[0]):
+            steps = 1 + min(near[n] for n in grid_neighbors(self.size, *cell) if n in near)
+            gain = -MOVE_COST * steps
+            results, gold = self.outcomes(visited, evidence, candidates, cell)
+            if results:
+                home = DistanceField(self.size, START, visited | {cell}).distance[cell]
+            for p, breeze, stench in results:
+                gain += p * gold * (GOLD_REWARD - MOVE_COST * home)
+                after = Belief(observations | {(cell, breeze, stench)}, cell, shot)
+                gain += p * (1 - gold) * self.value(after, depth + 1)
+            yield ("move", cell), gain
+
+        if shot is not None or not candidates:
+            return
+        for cell in sorted(visited):
+            for direction in DIRECTIONS:
+                line = set(self.line(cell, direction))
+                hit = len(candidates & line) / len(candidates)
+                if not hit:
+                    continue
+                gain = -MOVE_COST * near[cell] - SHOOT_COST
+                gain += hit * self.value(Belief(observations, cell, True), depth + 1)
+                if hit < 1:
+                    gain += (1 - hit) * self.value(Belief(observations, cell, frozenset(line)), depth + 1)
+                yield ("shoot", cell, direction), gain
+
+    def play(self, layout):
+        # Follow the optimal belief policy on one world; returns its Solution
+        world = WumpusWorld(**layout)
+        actions = []
+        percepts = world.percepts()
+        belief = Belief(frozenset({(START, percepts.breeze, percepts.stench)}), START, None)
+        while not world.done:
+            if percepts.glitter:
+                actions += ["grab"] + walk(world.position, world.route_to(START)) + ["climb"]
+                world.grab()
+                world.go_to(*START)
+                world.climb()
+                break
+            action, gain = max(self.options(belief), key=lambda option: option[1],
+                               default=(None, 0.0))
+            if action is None or gain <= 0:
+                break
+            cell = action[1]
+            if cell != world.position:
+                actions += walk(world.position, world.route_to(cell))
+                world.go_to(*cell)
+            if action[0] == "shoot":
+                actions.append("shoot_" + action[2])
+                world.shoot(action[2])
+                shot = True if world.scream else frozenset(self.line(cell, action[2]))
+                belief = Belief(belief.observations, cell, shot)
+            else:
+                percepts = world.percepts()
+                observations = belief.observations | {(cell, percepts.breeze, percepts.stench)}
+                belief = Belief(observations, cell, belief.shot)
+        return Solution(world.score, actions)
+
+
+# Per-process solvers, so the transposition table is shared by every world
+# a worker solves
+_solvers = {}
+
+
+def solve(layout, mode="full", pit_density=PIT_DENSITY, max_depth=None):
+    if mode == "full":
+        return full_information(layout)
+    key = (layout["size"], pit_density, max_depth)
+    if key not in _solvers:
+        _solvers[key] = BeliefSolver(layout["size"], pit_density, max_depth)
+    return _solvers[key].play(layout)
+
+
+def solve_seeds(seeds, modes, size, pit_density, max_depth, worlds=None):
+    if worlds is not None:
+        from world_store import open_store, record_layout
+        store = open_store(worlds)
+    results = []
+    for seed in seeds:
+        if worlds is None:
+            layout = random_layout(seed, size, pit_density)
+        else:
+            layout = record_layout(store[seed])
+            seed = int(store[seed]["seed"])
+        result = {"seed": seed}
+        for mode in modes:
+            start = time.perf_counter()
+            result[mode] = solve(layout, mode, pit_density, max_depth).score
+            result[f"{mode}_time"] = time.perf_counter() - start
+        results.append(result)
+    return results
+
+
+def mode_label(mode, max_depth):
+    if mode == "full":
+        return "full-information oracle"
+    if max_depth is None:
+        return "belief-state oracle"
+    return f"depth-{max_depth} belief heuristic (not an upper bound)"
+
+
+def score_gaps(oracle, agents, modes=MODES):
+    # Mean oracle-minus-agent score per mode over the seeds both runs share
+    scores = {result["seed"]: result["score"] for result in agents}
+    gaps = {}
+    for mode in modes:
+        pairs = [(result[mode], scores[result["seed"]]) for result in oracle
+                 if mode in result and result["seed"] in scores]
+        if pairs:
+            gaps[mode] = sum(best - score for best, score in pairs) / len(pairs)
+    return gaps
+
+
+def main(argv=None):
+    import argparse
+    from concurrent.futures import ProcessPoolExecutor
+
+    from batch import chunks, parse_seeds
+
+    parser = argparse.ArgumentParser(description="Best achievable scores for seeded Wumpus worlds.")
+    parser.add_argument("--seeds", type=parse_seeds, default=None,
+                        help="seed range, either N or START:STOP (default 1000)")
+    parser.add_argument("--worlds", metavar="PATH", help="solve rows of a world_store.py file")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="full")
+    parser.add_argument("--size", type=int, default=GRID_SIZE)
+    parser.add_argument("--pit-density", type=float, default=PIT_DENSITY)
+    parser.add_argument("--max-depth", type=int, default=None,
+                        help=f"belief mode: squares to look ahead, 0 for an exact search "
+                             f"(default: exact; required above {EXACT_SIZE}x{EXACT_SIZE})")
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--compare", metavar="RESULTS", help="batch.py results to report score gaps for")
+    parser.add_argument("--out", default="oracle.jsonl")
+    args = parser.parse_args(argv)
+
+    seeds = args.seeds
+    if args.worlds is not None:
+        from world_store import open_store
+        rows = len(open_store(args.worlds))
+        seeds = range(rows) if seeds is None else range(seeds.start, min(seeds.stop, rows))
+    elif seeds is None:
+        seeds = range(1000)
+    modes = MODES if args.mode == "both" else (args.mode,)
+    if "belief" in modes and args.max_depth is None and args.size > EXACT_SIZE:
+        parser.error(f"belief mode is only exact up to {EXACT_SIZE}x{EXACT_SIZE}; pass "
+                     f"--max-depth N for a depth-N heuristic or 0 for an exact search")
+    max_depth = args.max_depth or None
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count() or 1) as pool, \
+            open(args.out, "w") as out:
+        jobs = [pool.submit(solve_seeds, chunk, modes, args.size, args.pit_density,
+                            max_depth, args.worlds)
+                for chunk in chunks(seeds.start, seeds.stop, args.chunk_size)]
+        for job in jobs:
+            for result in job.result():
+                out.write(json.dumps(result) + "\n")
+                results.append(result)
+    elapsed = time.perf_counter() - start
+
+    if results:
+        print(f"{len(results)} worlds in {elapsed:.2f}s ({len(results) / elapsed:.0f} worlds/s)")
+        for mode in modes:
+            print(f"{mode_label(mode, max_depth)}: mean score "
+                  f"{sum(r[mode] for r in results) / len(results):.1f}")
+    if args.compare:
+        with open(args.compare) as f:
+            agents = [json.loads(line) for line in f]
+        # A heuristic is not a bound on the agents, so it gets no gap
+        bounded = [mode for mode in modes if mode == "full" or max_depth is None]
+        for mode, gap in score_gaps(results, agents, bounded).items():
+            print(f"agent vs {mode_label(mode, max_depth)}: mean score gap {gap:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+from collections import OrderedDict, deque
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def grid_neighbors(size, x, y):
+    # The squares orthogonally adjacent to (x, y); the one neighbour helper
+    # shared by the engine, the agents, the planner and the estimates
+    cells = []
+    if x < size:
+        cells.append((x + 1, y))
+    if x > 1:
+        cells.append((x - 1, y))
+    if y < size:
+        cells.append((x, y + 1))
+    if y > 1:
+        cells.append((x, y - 1))
+    return tuple(cells)
+
+
+class DistanceField:
+    # BFS distance from every reachable passable cell to `root`, kept up to
+    # date as cells become passable. Cells are only ever added, so distances
+    # only shrink: a new cell takes its best neighbour's distance plus one and
+    # the improvement is pushed outwards, touching just the cells it shortens.
+    def __init__(self, size, root, cells=()):
+        self.size = size
+        self.root = root
+        self.cells = set(cells)
+        self.cells.add(root)
+        self.distance = {root: 0}
+        self.relax([root])
+
+    def add(self, cell):
+        if cell in self.cells:
+            return
+        self.cells.add(cell)
+        known = [self.distance[n] for n in grid_neighbors(self.size, *cell) if n in self.distance]
+        if known:
+            self.distance[cell] = min(known) + 1
+            self.relax([cell])
+
+    def relax(self, cells):
+        queue = deque(cells)
+        while queue:
+            cell = queue.popleft()
+            step = self.distance[cell] + 1
+            for n in grid_neighbors(self.size, *cell):
+                if n in self.cells and self.distance.get(n, step + 1) > step:
+                    self.distance[n] = step
+                    queue.append(n)
+
+    def path(self, start):
+        # Cells to walk from `start` to the root (start excluded), or None
+        if start not in self.distance:
+            return None
+        route = []
+        cell = start
+        while cell != self.root:
+            cell = next(n for n in grid_neighbors(self.size, *cell)
+                        if self.distance.get(n) == self.distance[cell] - 1)
+            route.append(cell)
+        return route
+
+
+class SafePlanner:
+    # Shortest routes over known-safe cells, one DistanceField per
+    # destination. Fields are built on first use, updated as cells are added
+    # and the least recently used ones are dropped beyond `max_fields`.
+    def __init__(self, size, cells=(), max_fields=8):
+        self.size = size
+        self.cells = set(cells)
+        self.max_fields = max_fields
+        self.fields = OrderedDict()
+
+    def add(self, cell):
+        if cell in self.cells:
+            return
+        self.cells.add(cell)
+        for field in self.fields.values():
+            field.add(cell)
+
+    def field(self, target):
+        if target in self.fields:
+            self.fields.move_to_end(target)
+        else:
+            self.fields[target] = DistanceField(self.size, target, self.cells)
+            if len(self.fields) > self.max_fields:
+                self.fields.popitem(last=False)
+        return self.fields[target]
+
+    def route(self, start, target):
+        # The target itself need not be safe yet; every cell before it must be
+        return self.field(target).path(start)
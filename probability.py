@@ -0,0 +1,198 @@
+from functools import lru_cache
+
+from planner import grid_neighbors
+from wumpus_engine import PIT_DENSITY
+
+MAX_ENUMERATION = 18  # frontier squares enumerated exactly per component
+
+
+def frontier_components(cells, constraints):
+    # Split the frontier into groups of squares linked by a shared breeze,
+    # which are independent of each other given the evidence
+    parent = {cell: cell for cell in cells}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for constraint in constraints:
+        root = find(constraint[0])
+        for cell in constraint[1:]:
+            parent[find(cell)] = root
+
+    groups = {}
+    for cell in cells:
+        groups.setdefault(find(cell), ([], []))[0].append(cell)
+    for constraint in constraints:
+        groups[find(constraint[0])][1].append(constraint)
+    return list(groups.values())
+
+
+def canonical(cells, constraints):
+    # Marginals depend only on which squares share which breezes, so the
+    # component is reduced to a structural signature: identical patterns
+    # found anywhere on the board, or on another board, share a cache entry
+    cells = sorted(cells)
+    index = {cell: i for i, cell in enumerate(cells)}
+    signature = tuple(sorted(tuple(sorted(index[c] for c in constraint))
+                             for constraint in constraints))
+    return cells, signature
+
+
+@lru_cache(maxsize=4096)
+def component_marginals(count, signature, prior):
+    # P(pit) of each square in a component, by enumerating only the
+    # assignments that explain every breeze
+    if count > MAX_ENUMERATION:
+        return approximate_marginals(count, signature, prior)
+
+    # Check each breeze as soon as its last square has been decided
+    closing = [[] for _ in range(count)]
+    for constraint in signature:
+        closing[max(constraint)].append(constraint)
+
+    totals = [0.0] * count
+    total = 0.0
+    assignment = [False] * count
+
+    def expand(i, weight):
+        nonlocal total
+        if i == count:
+            total += weight
+            for c in range(count):
+                if assignment[c]:
+                    totals[c] += weight
+            return
+        for value, p in ((True, prior), (False, 1 - prior)):
+            assignment[i] = value
+            if all(any(assignment[c] for c in constraint) for constraint in closing[i]):
+                expand(i + 1, weight * p)
+
+    expand(0, 1.0)
+    return tuple(t / total for t in totals) if total else (0.0,) * count
+
+
+@lru_cache(maxsize=4096)
+def component_weight(count, signature, prior):
+    # Probability that a component's squares explain all of its breezes
+    if count > MAX_ENUMERATION:
+        return approximate_weight(signature, prior)
+    closing = [[] for _ in range(count)]
+    for constraint in signature:
+        closing[max(constraint)].append(constraint)
+    assignment = [False] * count
+
+    def expand(i):
+        if i == count:
+            return 1.0
+        total = 0.0
+        for value, p in ((True, prior), (False, 1 - prior)):
+            assignment[i] = value
+            if all(any(assignment[c] for c in constraint) for constraint in closing[i]):
+                total += p * expand(i + 1)
+        return total
+
+    return expand(0)
+
+
+def approximate_weight(signature, prior):
+    # Too big to enumerate: treat every breeze as explained independently
+    weight = 1.0
+    for constraint in signature:
+        weight *= 1 - (1 - prior) ** len(constraint)
+    return weight
+
+
+def approximate_marginals(count, signature, prior):
+    # Too big to enumerate: treat every breeze as explained independently
+    marginals = [prior] * count
+    for constraint in signature:
+        p = prior / (1 - (1 - prior) ** len(constraint))
+        for c in constraint:
+            marginals[c] = max(marginals[c], p)
+    return tuple(marginals)
+
+
+def pit_evidence(size, visited, breezy):
+    # (frontier, squares known to be pit-free, one tuple of candidate
+    # squares per breeze)
+    clean = set(visited)
+    frontier = set()
+    for cell in visited:
+        near = set(grid_neighbors(size, *cell)) - visited
+        frontier |= near
+        if cell not in breezy:
+            clean |= near
+
+    constraints = []
+    for cell in breezy:
+        constraint = tuple(sorted(n for n in grid_neighbors(size, *cell) if n not in clean))
+        if constraint:
+            constraints.append(constraint)
+    return frontier, clean, constraints
+
+
+def evidence_weight(constraints, prior):
+    # Probability of the breezes, as a product over independent components
+    unknown = sorted({c for constraint in constraints for c in constraint})
+    weight = 1.0
+    for cells, constraints_ in frontier_components(unknown, constraints):
+        cells, signature = canonical(cells, constraints_)
+        weight *= component_weight(len(cells), signature, prior)
+    return weight
+
+
+def clear_probability(size, visited, breezy, cells, prior=PIT_DENSITY, evidence=None):
+    # P(none of `cells` holds a pit) given the breezes felt so far; pass
+    # evidence=pit_evidence(...) to share it between queries
+    _, clean, constraints = evidence or pit_evidence(size, set(visited), breezy)
+    cells = set(cells) - clean
+    remaining = [tuple(c for c in constraint if c not in cells) for constraint in constraints]
+    if not all(remaining):
+        return 0.0
+    ratio = ((1 - prior) ** len(cells) * evidence_weight(remaining, prior)
+             / evidence_weight(constraints, prior))
+    # Exact weights keep this a probability; past MAX_ENUMERATION the
+    # approximate ones need not, so keep it in range
+    return min(1.0, max(0.0, ratio))
+
+
+def frontier_probabilities(size, visited, breezy, smelly, wumpus_dead=False, prior=PIT_DENSITY):
+    # P(pit) and P(wumpus) for every unvisited square next to a visited one
+    frontier, clean, constraints = pit_evidence(size, visited, breezy)
+
+    pit = {cell: 0.0 for cell in frontier}
+    unknown = sorted({c for constraint in constraints for c in constraint})
+    for cells, constraints_ in frontier_components(unknown, constraints):
+        cells, signature = canonical(cells, constraints_)
+        for cell, p in zip(cells, component_marginals(len(cells), signature, prior)):
+            pit[cell] = p
+
+    wumpus = wumpus_probabilities(size, visited, smelly, frontier, wumpus_dead)
+    return {cell: (pit[cell], wumpus[cell]) for cell in frontier}
+
+
+def wumpus_probabilities(size, visited, smelly, cells, wumpus_dead=False):
+    # A single wumpus, uniformly placed among the squares the evidence allows
+    if wumpus_dead:
+        return dict.fromkeys(cells, 0.0)
+    excluded = set(visited)
+    for cell in visited:
+        if cell not in smelly:
+            excluded.update(grid_neighbors(size, *cell))
+
+    if smelly:
+        candidates = None
+        for cell in smelly:
+            near = set(grid_neighbors(size, *cell)) - excluded
+            candidates = near if candidates is None else candidates & near
+        count = len(candidates)
+    else:
+        candidates = None  # anywhere not excluded
+        count = size * size - len(excluded)
+
+    p = 1.0 / count if count else 0.0
+    return {cell: p if cell not in excluded and (candidates is None or cell in candidates) else 0.0
+            for cell in cells}
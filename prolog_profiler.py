@@ -0,0 +1,116 @@
+import marshal
+import re
+import sys
+import time
+from collections import defaultdict
+
+from wumpus_engine import WumpusWorld
+
+# Literal numbers are replaced so breeze([2,3]) and breeze([1,1]) aggregate
+# under the same template, breeze([N,N]); per-world module names are
+# collapsed the same way so all worlds share templates
+_NUMBER = re.compile(r"(?<![A-Za-z_])-?\d+(?:\.\d+)?")
+_MODULE = re.compile(r"\bwumpus_world_\w+:")
+
+
+def normalize(text):
+    return _NUMBER.sub("N", _MODULE.sub("WORLD:", " ".join(text.split())))
+
+
+class CallStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = defaultdict(int)  # microsecond power-of-two bucket -> calls
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.histogram[max(0, int(seconds * 1e6)).bit_length()] += 1
+
+
+class InstrumentedProlog:
+    # Opt-in wrapper around a pyswip Prolog instance that counts every query,
+    # assertz and retractall per (game action, kind, template) and records
+    # its latency. Pass it as PrologWumpusWorld(prolog=InstrumentedProlog()).
+    def __init__(self, prolog=None):
+        if prolog is None:
+            from pyswip import Prolog
+            prolog = Prolog()
+        self.prolog = prolog
+        self.stats = defaultdict(CallStats)
+
+    def __getattr__(self, name):
+        return getattr(self.prolog, name)
+
+    def calling_action(self):
+        # Name of the nearest public engine method on the call stack
+        frame = sys._getframe(2)
+        while frame is not None:
+            name = frame.f_code.co_name
+            if not name.startswith("_") and isinstance(frame.f_locals.get("self"), WumpusWorld):
+                return name
+            frame = frame.f_back
+        return "-"
+
+    def record(self, kind, text, seconds):
+        self.stats[(self.calling_action(), kind, normalize(text))].add(seconds)
+
+    def query(self, text, *args, **kwargs):
+        start = time.perf_counter()
+        results = list(self.prolog.query(text, *args, **kwargs))
+        self.record("query", text, time.perf_counter() - start)
+        return iter(results)
+
+    def assertz(self, text, *args, **kwargs):
+        start = time.perf_counter()
+        result = self.prolog.assertz(text, *args, **kwargs)
+        self.record("assertz", text, time.perf_counter() - start)
+        return result
+
+    def retractall(self, text, *args, **kwargs):
+        start = time.perf_counter()
+        result = self.prolog.retractall(text, *args, **kwargs)
+        self.record("retractall", text, time.perf_counter() - start)
+        return result
+
+    def run_goal(self, goal, variables, name=None):
+        # Prebuilt wumpus.pl calls from PrologWumpusWorld, one template per rule
+        from prolog_world import run_goal
+        start = time.perf_counter()
+        result = run_goal(goal, variables, name)
+        self.record("call", f"wumpus:{name}", time.perf_counter() - start)
+        return result
+
+    def reset_stats(self):
+        self.stats.clear()
+
+    def report(self, limit=None):
+        rows = sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True)
+        lines = [f"{'action':<14}{'kind':<12}{'calls':>8}{'total ms':>11}{'mean us':>10}{'max us':>10}  template"]
+        for (action, kind, template), stats in rows[:limit]:
+            lines.append(
+                f"{action:<14}{kind:<12}{stats.count:>8}{stats.total * 1e3:>11.2f}"
+                f"{stats.total / stats.count * 1e6:>10.1f}{stats.max * 1e6:>10.1f}  {template}"
+            )
+        return "\n".join(lines)
+
+    def histogram(self, key):
+        # [(upper bound in microseconds, calls)] for one (action, kind, template)
+        buckets = self.stats[key].histogram
+        return [(1 << bucket, buckets[bucket]) for bucket in sorted(buckets)]
+
+    def dump_stats(self, path):
+        # Write a pstats-compatible file: every template is a "function" in
+        # the file "prolog", called from its game action
+        entries = {}
+        for (action, kind, template), stats in self.stats.items():
+            timing = (stats.count, stats.count, stats.total, stats.total)
+            cc, nc, tt, ct, callers = entries.get(("prolog", 0, f"{kind} {template}"), (0, 0, 0.0, 0.0, {}))
+            callers[("prolog", 0, action)] = timing
+            entries[("prolog", 0, f"{kind} {template}")] = (
+                cc + stats.count, nc + stats.count, tt + stats.total, ct + stats.total, callers)
+        with open(path, "wb") as f:
+            marshal.dump(entries, f)
@@ -0,0 +1,215 @@
+import itertools
+import os
+from functools import lru_cache
+
+from wumpus_engine import (
+    DIRECTIONS, GOLD_REWARD, GRID_SIZE, MOVE_COST, SHOOT_COST,
+    Percepts, WumpusWorld, iter_marked,
+)
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wumpus.pl")
+
+# Order of the State list built by game_state/2 in wumpus.pl
+STATE_FIELDS = ("X", "Y", "Score", "Timer", "Breeze", "Stench", "Glitter",
+                "WumpusDead", "HasGold", "HasArrow", "InPit", "Eaten", "Adjacent")
+
+_loaded = set()
+
+# pyswip finds and starts SWI-Prolog on import, so it is only imported once
+# the first Prolog world is created; importing this module stays cheap
+Atom = Functor = Prolog = Query = Variable = None
+PrologError = getTerm = None
+PL_open_foreign_frame = PL_discard_foreign_frame = PL_exception = None
+
+
+def load_pyswip():
+    global Atom, Functor, Prolog, Query, Variable, PrologError, getTerm
+    global PL_open_foreign_frame, PL_discard_foreign_frame, PL_exception
+    if Prolog is None:
+        from pyswip import Atom, Functor, Prolog, Query, Variable
+        from pyswip.core import PL_discard_foreign_frame, PL_exception, PL_open_foreign_frame
+        from pyswip.easy import getTerm
+        from pyswip.prolog import PrologError
+
+
+def load_rules(prolog):
+    # Consult wumpus.pl once per process; SWI compiles it on load
+    if RULES_FILE not in _loaded:
+        prolog.consult(RULES_FILE)
+        _loaded.add(RULES_FILE)
+
+
+@lru_cache(maxsize=None)
+def rule(name, arity):
+    return Functor(name, arity)
+
+
+def wumpus_goal(name, *args):
+    # wumpus:Name(Args...) built from terms, with nothing for SWI to parse
+    return rule(":", 2)(Atom("wumpus"), rule(name, len(args))(*args))
+
+
+def run_goal(goal, variables, name=None):
+    # First solution of a prebuilt goal, as the values of `variables`
+    query = Query(goal)
+    try:
+        if not query.nextSolution():
+            error = PL_exception(query.qid)
+            if error:
+                raise PrologError(f"wumpus:{name} raised {getTerm(error)}")
+            raise RuntimeError(f"Prolog goal failed: wumpus:{name}")
+        return [variable.value for variable in variables]
+    finally:
+        query.closeQuery()
+
+
+class PrologWumpusWorld(WumpusWorld):
+    # Same engine API as WumpusWorld, but the world and the game state live in
+    # the Prolog knowledge base and every rule is answered by wumpus.pl.
+    #
+    # pyswip shares one SWI engine per process, so every world keeps its facts
+    # in its own SWI module, named after the world id. Worlds do not see each
+    # other's facts, and close() drops the whole module at once.
+    #
+    # Each action is one call of a compiled wumpus.pl predicate, built from
+    # Functor/Variable terms, that applies the action and returns the
+    # resulting game state.
+    _ids = itertools.count(1)
+
+    def __init__(self, size=GRID_SIZE, gold=(3, 3), wumpus=(4, 4), pits=((1, 4), (3, 1)),
+                 prolog=None, world_id=None):
+        load_pyswip()
+        self.set_layout(size, gold, wumpus, pits)
+        # Any object with the pyswip interface, e.g.
+        # prolog_profiler.InstrumentedProlog
+        self.prolog = prolog if prolog is not None else Prolog()
+        self._run_goal = getattr(self.prolog, "run_goal", run_goal)
+        self.world_id = world_id if world_id is not None else next(self._ids)
+        self.module = f"wumpus_world_{self.world_id}"
+        self.module_atom = Atom(self.module)
+        load_rules(self.prolog)
+        self.setup_prolog()
+        self.reset()
+
+    def _call(self, name, *args):
+        # Run wumpus:Name(Module, Args..., Event, State) and cache the state.
+        # The goal's term refs live in a foreign frame that is discarded once
+        # the answer has been read back, so they do not pile up on the SWI
+        # local stack over a long session.
+        frame = PL_open_foreign_frame()
+        try:
+            event, state = Variable(), Variable()
+            goal = wumpus_goal(name, self.module_atom, *args, event, state)
+            event_value, state_value = self._run_goal(goal, (event, state), name)
+        finally:
+            PL_discard_foreign_frame(frame)
+        if isinstance(state_value, list):
+            self.state = dict(zip(STATE_FIELDS, state_value))
+        return str(event_value)
+
+    def close(self):
+        self._call("drop_world")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def setup_prolog(self):
+        self._call(
+            "new_world", self.size, [MOVE_COST, SHOOT_COST, GOLD_REWARD],
+            list(self.gold), [list(wumpus) for wumpus in self.wumpuses],
+            [list(pit) for pit in sorted(self.pits)],
+        )
+
+    def restore(self, state):
+        # Visited cells, live wumpuses and the percept maps are mirrored on the
+        # Python side; the Prolog facts are replaced in one call
+        self.wumpus_map = state.wumpus_map
+        self.visited = state.visited
+        self.stench_map = state.stench_map
+        self.glitter_map = state.glitter_map
+        self.scream = state.scream
+        self.done = state.done
+        self.outcome = state.outcome
+        self.event = None
+        self._planner = None
+        self._call(
+            "restore", list(state.position), state.score, state.timer,
+            int(state.has_gold), int(state.has_arrow),
+            [list(cell) for cell in iter_marked(self.size, state.wumpus_map)],
+        )
+
+    @property
+    def position(self):
+        return (self.state["X"], self.state["Y"])
+
+    @property
+    def score(self):
+        return self.state["Score"]
+
+    @property
+    def timer(self):
+        return self.state["Timer"]
+
+    @property
+    def has_gold(self):
+        return self.state["HasGold"] == 1
+
+    @property
+    def has_arrow(self):
+        return self.state["HasArrow"] == 1
+
+    @property
+    def wumpus_dead(self):
+        return self.state["WumpusDead"] == 1
+
+    def neighbors(self, x, y):
+        if (x, y) == self.position:
+            return [tuple(adj) for adj in self.state["Adjacent"]]
+        return WumpusWorld.neighbors(self, x, y)
+
+    def is_adjacent(self, a, b):
+        return tuple(b) in self.neighbors(*a)
+
+    def percepts(self):
+        return Percepts(
+            breeze=self.state["Breeze"] == 1,
+            stench=self.state["Stench"] == 1,
+            glitter=self.state["Glitter"] == 1,
+            scream=self.scream,
+        )
+
+    def move_to(self, x, y):
+        if not self._begin_action():
+            return self.event
+        self.event = self._call("move", [x, y])
+        if self.event == "invalid_move":
+            return self.event
+
+        self._visit(x, y)
+        if self.event in ("pit", "wumpus"):
+            self._finish(self.event)
+        return self.event
+
+    def shoot(self, direction):
+        if not self._begin_action():
+            return self.event
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction!r}")
+
+        # The target comes from the Python-side line index of live wumpuses
+        target = self.line_of_fire(direction) if self.has_arrow else None
+        self.event = self._call("shoot", list(target) if target else Atom("none"))
+        if self.event == "killed_wumpus":
+            self._kill_wumpus(*target)
+        return self.event
+
+    def grab(self):
+        if not self._begin_action():
+            return self.event
+        self.event = self._call("grab")
+        if self.event == "grabbed_gold":
+            self._mark("glitter_map", *self.gold, 0)
+        return self.event
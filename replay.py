@@ -0,0 +1,157 @@
+import argparse
+import struct
+import sys
+import time
+
+from wumpus_engine import (
+    ACTIONS, WumpusWorld, cell_index, cell_position, iter_cells,
+)
+
+# A replay file is a header with the world layout followed by one fixed-width
+# record per action: the action code, then the agent's cell index and the
+# score after it was applied. The top bit of the code marks actions the
+# player can undo. The layout is stored as the engine's bitboards,
+# little-endian, so any size of board fits.
+MAGIC = b"WREC"
+VERSION = 1
+HEADER = struct.Struct("<4sBHI")   # magic, version, size, gold cell index
+RECORD = struct.Struct("<BIi")     # action code, cell index, score
+
+# Codes are indices into this tuple. Besides the engine's actions, the GUI's
+# undo (back to the state before the last undoable action) and restart are
+# recorded, so a game that used them still replays exactly.
+REPLAY_ACTIONS = ACTIONS + ("undo", "reset")
+ACTION_CODES = {action: code for code, action in enumerate(REPLAY_ACTIONS)}
+UNDOABLE = 0x80
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def bitboard_bytes(size):
+    return (size * size + 7) // 8
+
+
+class ReplayRecorder:
+    # Appends one record per action to `path` as the game is played. Writes
+    # are buffered by the file object; flush() or close() pushes them out,
+    # and the GUI flushes once per frame along with its action log.
+    def __init__(self, path, world):
+        self.path = path
+        self.file = open(path, "wb")
+        size = world.size
+        width = bitboard_bytes(size)
+        self.file.write(HEADER.pack(MAGIC, VERSION, size, cell_index(size, *world.gold)))
+        self.file.write(world.initial_wumpus_bits.to_bytes(width, "little"))
+        self.file.write(world.pit_bits.to_bytes(width, "little"))
+        self.world = world
+        self.count = 0
+
+    def record(self, action, undoable=False):
+        # Call after `action` has been applied to the world; undoable=True
+        # when the driver saved the state before it for a later undo
+        world = self.world
+        code = ACTION_CODES[action] | (UNDOABLE if undoable else 0)
+        self.file.write(RECORD.pack(code, cell_index(world.size, *world.position), world.score))
+        self.count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_replay(path):
+    # (layout, records) where records are (action, undoable, position, score)
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ReplayError(f"{path} is too short to be a replay")
+    magic, version, size, gold = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ReplayError(f"{path} is not a version {VERSION} replay")
+    width = bitboard_bytes(size)
+    offset = HEADER.size
+    wumpus_bits = int.from_bytes(data[offset:offset + width], "little")
+    pit_bits = int.from_bytes(data[offset + width:offset + 2 * width], "little")
+    offset += 2 * width
+    if (len(data) - offset) % RECORD.size:
+        raise ReplayError(f"{path} ends in a partial record")
+    layout = {
+        "size": size,
+        "gold": cell_position(size, gold),
+        "wumpus": list(iter_cells(size, wumpus_bits)),
+        "pits": list(iter_cells(size, pit_bits)),
+    }
+    try:
+        records = [(REPLAY_ACTIONS[code & ~UNDOABLE], bool(code & UNDOABLE),
+                    cell_position(size, cell), score)
+                   for code, cell, score in RECORD.iter_unpack(data[offset:])]
+    except IndexError:
+        raise ReplayError(f"{path} has an unknown action code") from None
+    return layout, records
+
+
+def replay(path, factory=WumpusWorld, verbose=False):
+    # Play a recording back on a fresh world, headless and as fast as the
+    # engine goes. Every step must land on the recorded position and score,
+    # so a replay that diverges (a rules change, a backend bug) fails at the
+    # first action that differs. Returns the world in its final state.
+    layout, records = read_replay(path)
+    world = factory(**layout)
+    history = []
+    for number, (action, undoable, position, score) in enumerate(records, 1):
+        if action == "reset":
+            history = []
+            world.reset()
+        elif action == "undo":
+            if not history:
+                raise ReplayError(f"action {number}: undo with nothing to undo")
+            world.restore(history.pop())
+        else:
+            if undoable:
+                history.append(world.snapshot())
+            world.step(action)
+        if (world.position, world.score) != (position, score):
+            raise ReplayError(
+                f"action {number} ({action}): replay is at {world.position} with score "
+                f"{world.score}, recording has {position} with score {score}")
+        if verbose:
+            print(f"{number:6} {action:<12} {position} score {score}")
+    return world
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded Wumpus World game headless.")
+    parser.add_argument("path")
+    parser.add_argument("--backend", choices=("python", "prolog"), default="python")
+    parser.add_argument("--verbose", action="store_true", help="print every action")
+    args = parser.parse_args(argv)
+
+    factory = WumpusWorld
+    if args.backend == "prolog":
+        from prolog_world import PrologWumpusWorld
+        factory = PrologWumpusWorld
+
+    start = time.perf_counter()
+    try:
+        world = replay(args.path, factory, args.verbose)
+    except ReplayError as exc:
+        print(f"MISMATCH {exc}")
+        return 1
+    print(f"{args.path} replayed in {time.perf_counter() - start:.3f}s: "
+          f"outcome {world.outcome}, score {world.score}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
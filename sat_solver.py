@@ -0,0 +1,241 @@
+# Small incremental CDCL SAT solver.
+#
+# Literals are non-zero ints (v / -v). Clauses are only ever added, so
+# everything the solver derives stays valid: level-0 assignments and learnt
+# clauses are kept between calls, and each solve() starts from them instead
+# of from scratch. Queries are asked through assumptions, e.g.
+# solve([p]) is False  <=>  the clauses entail -p.
+#
+# A query only searches the clauses connected to its variables through
+# variables still open at level 0, and stops as soon as all of those are
+# satisfied, so its cost follows the part of the problem it is about rather
+# than the total number of variables. Other components are taken to be
+# satisfiable, which holds whenever the clauses describe a real world.
+
+
+class SatSolver:
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+        self.watches = {}
+        self.assign = [None]
+        self.level = [0]
+        self.reason = [None]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.occurs = {}  # variable -> indexes of the clauses it appears in
+        self.model = []   # literals set by the last satisfiable solve()
+        self.ok = True
+
+    def new_var(self):
+        self.num_vars += 1
+        self.assign.append(None)
+        self.level.append(0)
+        self.reason.append(None)
+        return self.num_vars
+
+    def value(self, lit):
+        a = self.assign[abs(lit)]
+        if a is None:
+            return None
+        return a if lit > 0 else not a
+
+    def add_clause(self, lits):
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        clause = []
+        for lit in dict.fromkeys(lits):
+            if -lit in clause:
+                return True  # tautology
+            value = self.value(lit)
+            if value is True:
+                return True
+            if value is None:
+                clause.append(lit)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+        return self.ok
+
+    def attach(self, clause):
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        for lit in clause:
+            self.occurs.setdefault(abs(lit), []).append(index)
+        return index
+
+    def enqueue(self, lit, reason):
+        var = abs(lit)
+        self.assign[var] = lit > 0
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        # Two-watched-literal unit propagation; returns a conflicting clause
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            watchers = self.watches.get(false_lit, [])
+            kept = self.watches[false_lit] = []
+            for n, index in enumerate(watchers):
+                clause = self.clauses[index]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watchers[n + 1:])
+                        self.qhead = len(self.trail)
+                        return index
+                    self.enqueue(clause[0], index)
+        return None
+
+    def analyze(self, conflict):
+        # First-UIP conflict analysis; returns the learnt clause (asserting
+        # literal first) and the level to backjump to
+        current = len(self.trail_lim)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        lit = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                var = abs(q)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    if self.level[var] == current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reason[abs(lit)]]
+        learnt[0] = -lit
+
+        backjump = 0
+        for k in range(1, len(learnt)):
+            if self.level[abs(learnt[k])] > backjump:
+                backjump = self.level[abs(learnt[k])]
+                learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, backjump
+
+    def backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.assign[var] = None
+            self.reason[var] = None
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def component(self, variables):
+        # Indexes of the clauses linked to `variables`, walking only through
+        # variables open at level 0. Clauses already satisfied at level 0
+        # stay satisfied, so they are dropped from the occurrence lists.
+        seen = set(variables)
+        queue = list(seen)
+        found = {}
+        while queue:
+            var = queue.pop()
+            live = []
+            for index in self.occurs.get(var, ()):
+                clause = self.clauses[index]
+                if any(self.value(lit) is True for lit in clause):
+                    continue
+                live.append(index)
+                if index in found:
+                    continue
+                found[index] = clause
+                for lit in clause:
+                    other = abs(lit)
+                    if other not in seen and self.assign[other] is None:
+                        seen.add(other)
+                        queue.append(other)
+            self.occurs[var] = live
+        return list(found.values())
+
+    def pick(self, clauses):
+        # A literal that satisfies the first unsatisfied clause, or None when
+        # every clause is satisfied. Hazards are rare, so negative first.
+        for clause in clauses:
+            choice = None
+            for lit in clause:
+                value = self.value(lit)
+                if value is True:
+                    break
+                if value is None and (choice is None or lit < 0 < choice):
+                    choice = lit
+            else:
+                return choice
+        return None
+
+    def solve(self, assumptions=()):
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+        assumptions = list(assumptions)
+        clauses = self.component(abs(lit) for lit in assumptions)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, backjump = self.analyze(conflict)
+                self.backtrack(backjump)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach(learnt))
+                continue
+
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                lit = assumptions[level]
+                value = self.value(lit)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value is None:
+                    self.enqueue(lit, None)
+                continue
+
+            lit = self.pick(clauses)
+            if lit is None:
+                # Any value works for the variables still unassigned
+                self.model = self.trail[self.trail_lim[0]:] if self.trail_lim else []
+                self.backtrack(0)
+                return True
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(lit, None)
@@ -0,0 +1,163 @@
+import numpy as np
+
+from wumpus_engine import (
+    ACTIONS, DIRECTIONS, GOLD_REWARD, GRID_SIZE, MOVE_COST, PIT_DENSITY,
+    SHOOT_COST, START, START_SCORE, random_layout,
+)
+
+# Columns of the observation array returned by reset() and step()
+OBSERVATION_FIELDS = ("breeze", "stench", "glitter", "scream", "x", "y")
+
+# Outcome codes, in the `outcomes` array
+OUTCOMES = (None, "pit", "wumpus", "won")
+PIT, WUMPUS, WON = 1, 2, 3
+
+# Action index -> (dx, dy) for moves (0-3) and shots (4-7); zero for grab/climb
+_STEPS = [DIRECTIONS.get(action.replace("shoot_", ""), (0, 0)) for action in ACTIONS]
+_DX = np.array([dx for dx, _ in _STEPS])
+_DY = np.array([dy for _, dy in _STEPS])
+_MOVE = np.array([a in DIRECTIONS for a in ACTIONS])
+_SHOOT = np.array([a.startswith("shoot_") for a in ACTIONS])
+_GRAB = ACTIONS.index("grab")
+_CLIMB = ACTIONS.index("climb")
+
+
+class VectorWumpusEnv:
+    # K independent worlds stepped together, Gym style. The state is kept as
+    # struct-of-arrays (one NumPy array per field, indexed by world), so a
+    # step is a fixed number of array operations whatever K is. Actions are
+    # indices into wumpus_engine.ACTIONS and the rules match WumpusWorld:
+    # -1 per move, -10 per shot, +500 for the gold. Finished worlds ignore
+    # their actions until they are reset.
+    def __init__(self, num_envs, size=GRID_SIZE, pit_density=PIT_DENSITY):
+        self.num_envs = num_envs
+        self.size = size
+        self.pit_density = pit_density
+        self.index = np.arange(num_envs)
+        cells = size * size
+        self.pits = np.zeros((num_envs, cells), dtype=bool)
+        self.breeze = np.zeros((num_envs, cells), dtype=bool)
+        self.gold = np.zeros(num_envs, dtype=np.int64)     # cell index
+        self.wumpus = np.zeros(num_envs, dtype=np.int64)   # cell index
+        self.x = np.zeros(num_envs, dtype=np.int64)        # 0-based
+        self.y = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.timer = np.zeros(num_envs, dtype=np.int64)
+        self.has_gold = np.zeros(num_envs, dtype=bool)
+        self.has_arrow = np.zeros(num_envs, dtype=bool)
+        self.wumpus_dead = np.zeros(num_envs, dtype=bool)
+        self.scream = np.zeros(num_envs, dtype=bool)
+        self.done = np.zeros(num_envs, dtype=bool)
+        self.outcomes = np.zeros(num_envs, dtype=np.int8)
+
+    def reset(self, seeds, indices=None):
+        # Load random_layout(seed) into the given worlds (all by default), so
+        # world i matches wumpus_engine.random_world(seeds[i], size)
+        indices = self.index if indices is None else np.asarray(indices)
+        if len(seeds) != len(indices):
+            raise ValueError("Need one seed per world being reset")
+        size = self.size
+        pits = np.zeros((len(indices), size * size), dtype=bool)
+        for row, seed in enumerate(seeds):
+            layout = random_layout(seed, size, self.pit_density)
+            for x, y in layout["pits"]:
+                pits[row, (y - 1) * size + x - 1] = True
+            self.gold[indices[row]] = (layout["gold"][1] - 1) * size + layout["gold"][0] - 1
+            self.wumpus[indices[row]] = (layout["wumpus"][1] - 1) * size + layout["wumpus"][0] - 1
+        return self.start(indices, pits)
+
+    def load(self, records, indices=None):
+        # Same as reset(), but from world_store records: the whole batch is
+        # unpacked with array operations, without regenerating any layout
+        indices = self.index if indices is None else np.asarray(indices)
+        if len(records) != len(indices):
+            raise ValueError("Need one record per world being reset")
+        if len(records) and (records["size"] != self.size).any():
+            raise ValueError(f"Records are not all {self.size}x{self.size} worlds")
+        cells = self.size * self.size
+        self.gold[indices] = records["gold"]
+        self.wumpus[indices] = records["wumpus"]
+        pits = np.unpackbits(records["pits"], axis=1, bitorder="little")[:, :cells]
+        return self.start(indices, pits.astype(bool))
+
+    def start(self, indices, pits):
+        self.pits[indices] = pits
+        self.breeze[indices] = self.spread(pits)
+
+        self.x[indices] = START[0] - 1
+        self.y[indices] = START[1] - 1
+        self.score[indices] = START_SCORE
+        self.timer[indices] = 0
+        self.has_gold[indices] = False
+        self.has_arrow[indices] = True
+        self.wumpus_dead[indices] = False
+        self.scream[indices] = False
+        self.done[indices] = False
+        self.outcomes[indices] = 0
+        return self.observations()
+
+    def spread(self, cells):
+        # Orthogonal neighbours of every set cell, for a batch of flat grids
+        n = self.size
+        grid = cells.reshape(-1, n, n)  # [world, y, x]
+        out = np.zeros_like(grid)
+        out[:, 1:, :] |= grid[:, :-1, :]
+        out[:, :-1, :] |= grid[:, 1:, :]
+        out[:, :, 1:] |= grid[:, :, :-1]
+        out[:, :, :-1] |= grid[:, :, 1:]
+        return out.reshape(cells.shape)
+
+    def observations(self):
+        n = self.size
+        position = self.y * n + self.x
+        wx, wy = self.wumpus % n, self.wumpus // n
+        stench = ~self.wumpus_dead & (np.abs(self.x - wx) + np.abs(self.y - wy) == 1)
+        glitter = (position == self.gold) & ~self.has_gold
+        return np.stack([
+            self.breeze[self.index, position], stench, glitter, self.scream,
+            self.x + 1, self.y + 1,
+        ], axis=1).astype(np.int64)
+
+    def step(self, actions):
+        # Apply one action per world; returns (observations, rewards, dones)
+        # with rewards as the score change of this step
+        actions = np.asarray(actions)
+        n = self.size
+        active = ~self.done
+        score_before = self.score.copy()
+        dx, dy = _DX[actions], _DY[actions]
+        tx, ty = self.x + dx, self.y + dy
+        inside = (tx >= 0) & (tx < n) & (ty >= 0) & (ty < n)
+
+        moved = active & _MOVE[actions] & inside
+        self.x = np.where(moved, tx, self.x)
+        self.y = np.where(moved, ty, self.y)
+        self.timer += moved
+        self.score -= MOVE_COST * moved
+        position = self.y * n + self.x
+        fell = moved & self.pits[self.index, position]
+        eaten = moved & ~fell & (position == self.wumpus) & ~self.wumpus_dead
+
+        # Arrows fly along the whole row or column
+        fired = active & _SHOOT[actions] & self.has_arrow
+        self.has_arrow &= ~fired
+        self.score -= SHOOT_COST * fired
+        wx, wy = self.wumpus % n, self.wumpus // n
+        in_line = np.where(dx != 0, (wy == self.y) & (np.sign(wx - self.x) == dx),
+                           (wx == self.x) & (np.sign(wy - self.y) == dy))
+        hit = fired & in_line & ~self.wumpus_dead
+        self.wumpus_dead |= hit
+        self.scream = hit
+
+        grabbed = active & (actions == _GRAB) & (position == self.gold) & ~self.has_gold
+        self.has_gold |= grabbed
+        self.score += GOLD_REWARD * grabbed
+
+        start = (START[1] - 1) * n + START[0] - 1
+        won = active & (actions == _CLIMB) & (position == start) & self.has_gold
+
+        self.outcomes[fell] = PIT
+        self.outcomes[eaten] = WUMPUS
+        self.outcomes[won] = WON
+        self.done |= fell | eaten | won
+        return self.observations(), self.score - score_before, self.done.copy()
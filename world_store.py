@@ -0,0 +1,86 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from wumpus_engine import (
+    GRID_SIZE, PIT_DENSITY, cell_index, cell_position, is_solvable, iter_cells,
+    random_layout, to_bitboard,
+)
+
+
+def record_dtype(size):
+    # One fixed-width record per world. Gold and wumpus are cell indices and
+    # the pits are the engine's pit bitboard as little-endian bytes.
+    return np.dtype([
+        ("seed", "<i8"),
+        ("size", "<u2"),
+        ("gold", "<u4"),
+        ("wumpus", "<u4"),
+        ("pits", "u1", ((size * size + 7) // 8,)),
+    ])
+
+
+def generate(path, count, size=GRID_SIZE, pit_density=PIT_DENSITY, first_seed=0, solvable=False):
+    # Write `count` worlds from random_layout(seed) for consecutive seeds to
+    # a .npy file. With solvable=True, seeds whose gold is unreachable are
+    # skipped; the stored seed still reproduces the record exactly.
+    dtype = record_dtype(size)
+    width = dtype["pits"].shape[0]
+    store = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(count,))
+    seed = first_seed
+    row = 0
+    while row < count:
+        layout = random_layout(seed, size, pit_density)
+        if not solvable or is_solvable(layout):
+            record = store[row]
+            record["seed"] = seed
+            record["size"] = size
+            record["gold"] = cell_index(size, *layout["gold"])
+            record["wumpus"] = cell_index(size, *layout["wumpus"])
+            record["pits"] = np.frombuffer(
+                to_bitboard(size, layout["pits"]).to_bytes(width, "little"), dtype=np.uint8)
+            row += 1
+        seed += 1
+    store.flush()
+    return seed - first_seed
+
+
+def open_store(path):
+    # Memory-mapped, read-only view of a store; records are read on access
+    return np.load(path, mmap_mode="r")
+
+
+def record_layout(record):
+    # Keyword arguments for WumpusWorld / set_layout from one record
+    size = int(record["size"])
+    return {
+        "size": size,
+        "gold": cell_position(size, int(record["gold"])),
+        "wumpus": cell_position(size, int(record["wumpus"])),
+        "pits": list(iter_cells(size, int.from_bytes(record["pits"].tobytes(), "little"))),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a corpus of seeded Wumpus worlds.")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--size", type=int, default=GRID_SIZE)
+    parser.add_argument("--pit-density", type=float, default=PIT_DENSITY)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--solvable", action="store_true",
+                        help="keep only worlds whose gold is reachable without hazards")
+    parser.add_argument("--out", default="worlds.npy")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    tried = generate(args.out, args.count, args.size, args.pit_density,
+                     args.first_seed, args.solvable)
+    print(f"{args.count} worlds ({tried} seeds tried) written to {args.out} "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
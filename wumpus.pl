@@ -0,0 +1,145 @@
+% Wumpus World game rules.
+%
+% Every world keeps its facts in its own module M (see prolog_world.py);
+% the rules below take M as their first argument and are compiled once
+% when this file is consulted. Action predicates end with (Event, State),
+% where State is the list read by game_state/3, so every action is a
+% single call from Python.
+
+:- module(wumpus, [new_world/8, drop_world/3, restore/9,
+                   move/4, shoot/4, grab/3]).
+
+world_predicates([grid_size/1, rules/3, pit_location/1, wumpus_location/1,
+                  gold_location/1, breeze/1, stench/1, glitter/1,
+                  agent_location/1, score/1, timer/1, has_gold/1,
+                  has_arrow/1, live_wumpus/1]).
+
+% World setup and teardown
+
+new_world(M, Size, [MoveCost, ShootCost, GoldReward], Gold, Wumpuses, Pits, created, none) :-
+    drop_world(M, _, _),
+    world_predicates(Preds),
+    forall(member(P, Preds), dynamic(M:P)),
+    assertz(M:grid_size(Size)),
+    assertz(M:rules(MoveCost, ShootCost, GoldReward)),
+    assertz(M:gold_location(Gold)),
+    forall(member(Wumpus, Wumpuses), assertz(M:wumpus_location(Wumpus))),
+    forall(member(Pit, Pits), assertz(M:pit_location(Pit))),
+    % Breezes never change, so they are derived once per world
+    forall(( M:pit_location(Pit), adjacent(M, Pit, Cell), \+ M:breeze(Cell) ),
+           assertz(M:breeze(Cell))).
+
+drop_world(M, dropped, none) :-
+    forall(current_predicate(M:P), abolish(M:P)).
+
+% Adjacency is arithmetic over the grid size
+
+adjacent(M, [X,Y], [X1,Y]) :- M:grid_size(N), X < N, X1 is X + 1.
+adjacent(_, [X,Y], [X1,Y]) :- X > 1, X1 is X - 1.
+adjacent(M, [X,Y], [X,Y1]) :- M:grid_size(N), Y < N, Y1 is Y + 1.
+adjacent(_, [X,Y], [X,Y1]) :- Y > 1, Y1 is Y - 1.
+
+% State
+
+truth(Goal, 1) :- call(Goal), !.
+truth(_, 0).
+
+set_fact(M, Fact) :-
+    functor(Fact, Name, Arity),
+    functor(Old, Name, Arity),
+    retractall(M:Old),
+    assertz(M:Fact).
+
+add_score(M, Delta) :-
+    M:score(S0),
+    S1 is S0 + Delta,
+    set_fact(M, score(S1)).
+
+game_state(M, [X, Y, Score, Timer, Breeze, Stench, Glitter,
+               WumpusDead, HasGold, HasArrow, InPit, Eaten, Adjacent]) :-
+    M:agent_location([X,Y]),
+    M:score(Score),
+    M:timer(Timer),
+    truth(\+ M:live_wumpus(_), WumpusDead),
+    M:has_gold(HasGold),
+    M:has_arrow(HasArrow),
+    truth(M:breeze([X,Y]), Breeze),
+    truth(M:stench([X,Y]), Stench),
+    truth(M:glitter([X,Y]), Glitter),
+    truth(M:pit_location([X,Y]), InPit),
+    truth(M:live_wumpus([X,Y]), Eaten),
+    findall([A,B], adjacent(M, [X,Y], [A,B]), Adjacent).
+
+derive_stench(M) :-
+    retractall(M:stench(_)),
+    forall(( M:live_wumpus(W), adjacent(M, W, Cell), \+ M:stench(Cell) ),
+           assertz(M:stench(Cell))).
+
+% Replace the game facts with a snapshot; stench and glitter follow from
+% the live wumpuses and the gold flag
+restore(M, Position, Score, Timer, HasGold, HasArrow, LiveWumpuses, restored, State) :-
+    set_fact(M, agent_location(Position)),
+    set_fact(M, score(Score)),
+    set_fact(M, timer(Timer)),
+    set_fact(M, has_gold(HasGold)),
+    set_fact(M, has_arrow(HasArrow)),
+    retractall(M:live_wumpus(_)),
+    forall(member(W, LiveWumpuses), assertz(M:live_wumpus(W))),
+    derive_stench(M),
+    retractall(M:glitter(_)),
+    (   HasGold == 0
+    ->  forall(M:gold_location(G), assertz(M:glitter(G)))
+    ;   true
+    ),
+    game_state(M, State).
+
+% Actions
+
+move(M, Target, Event, State) :-
+    M:agent_location(From),
+    (   adjacent(M, From, Target)
+    ->  set_fact(M, agent_location(Target)),
+        M:timer(T0),
+        T1 is T0 + 1,
+        set_fact(M, timer(T1)),
+        M:rules(MoveCost, _, _),
+        Cost is -MoveCost,
+        add_score(M, Cost),
+        (   M:pit_location(Target)
+        ->  Event = pit
+        ;   M:live_wumpus(Target)
+        ->  Event = wumpus
+        ;   Event = moved
+        )
+    ;   Event = invalid_move
+    ),
+    game_state(M, State).
+
+% Target is the first live wumpus in the arrow's row or column, found by
+% the caller from its sorted line index, or none
+shoot(M, Target, Event, State) :-
+    (   M:has_arrow(1)
+    ->  set_fact(M, has_arrow(0)),
+        M:rules(_, ShootCost, _),
+        Cost is -ShootCost,
+        add_score(M, Cost),
+        (   Target \== none, retract(M:live_wumpus(Target))
+        ->  derive_stench(M),
+            Event = killed_wumpus
+        ;   Event = missed
+        )
+    ;   Event = no_arrow
+    ),
+    game_state(M, State).
+
+grab(M, Event, State) :-
+    M:agent_location(Cell),
+    (   M:glitter(Cell)
+    ->  set_fact(M, has_gold(1)),
+        retractall(M:glitter(_)),
+        M:rules(_, _, GoldReward),
+        add_score(M, GoldReward),
+        Event = grabbed_gold
+    ;   Event = no_gold
+    ),
+    game_state(M, State).
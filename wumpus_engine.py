@@ -0,0 +1,435 @@
+import random
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from functools import lru_cache
+
+from planner import SafePlanner, grid_neighbors
+
+# Grid and scoring rules shared by every front end
+GRID_SIZE = 4
+START = (1, 1)
+START_SCORE = 30
+MOVE_COST = 1
+SHOOT_COST = 10
+GOLD_REWARD = 500
+PIT_DENSITY = 0.2
+
+DIRECTIONS = {
+    "up": (0, 1),
+    "down": (0, -1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+ACTIONS = (
+    "up", "down", "left", "right",
+    "shoot_up", "shoot_down", "shoot_left", "shoot_right",
+    "grab", "climb",
+)
+
+Percepts = namedtuple("Percepts", ["breeze", "stench", "glitter", "scream"])
+
+# Immutable snapshot of everything that changes during a game. The per-cell
+# maps are held as bytes, so restoring a state is a handful of references.
+# wumpus_map holds the live wumpuses; wumpus_dead is set once none is left.
+GameState = namedtuple("GameState", [
+    "position", "score", "timer", "has_gold", "has_arrow", "wumpus_dead",
+    "wumpus_map", "visited", "stench_map", "glitter_map", "scream", "done", "outcome",
+])
+
+
+def cell_index(size, x, y):
+    # Bit index of cell (x, y); row-major from (1, 1)
+    return (y - 1) * size + (x - 1)
+
+
+def cell_position(size, index):
+    return (index % size + 1, index // size + 1)
+
+
+def to_bitboard(size, cells):
+    bits = 0
+    for x, y in cells:
+        if not (1 <= x <= size and 1 <= y <= size):
+            raise ValueError(f"Cell ({x},{y}) is outside a {size}x{size} world")
+        bits |= 1 << cell_index(size, x, y)
+    return bits
+
+
+def as_cells(cells):
+    # A single (x, y) cell or any sequence of cells, as a tuple of cells
+    cells = tuple(cells)
+    if cells and isinstance(cells[0], int):
+        return (cells,)
+    return tuple(tuple(cell) for cell in cells)
+
+
+def iter_cells(size, bits):
+    while bits:
+        low = bits & -bits
+        yield cell_position(size, low.bit_length() - 1)
+        bits ^= low
+
+
+_BIT_BYTES = bytes.maketrans(b"01", b"\0\1")
+
+
+def to_cell_map(size, bits):
+    # Per-cell map of a bitboard: one byte per cell_index(), 1 where set
+    return format(bits, f"0{size * size}b")[::-1].encode().translate(_BIT_BYTES)
+
+
+def cell_map(size, cells):
+    # Per-cell map with a 1 on each of a few `cells`
+    marked = bytearray(size * size)
+    for x, y in cells:
+        marked[cell_index(size, x, y)] = 1
+    return bytes(marked)
+
+
+def iter_marked(size, cells):
+    # Cells set in a per-cell map
+    index = cells.find(1)
+    while index >= 0:
+        yield cell_position(size, index)
+        index = cells.find(1, index + 1)
+
+
+@lru_cache(maxsize=None)
+def board_masks(size):
+    # (all cells, column x=1, column x=size) for a size x size bitboard
+    full = (1 << size * size) - 1
+    first_col = full // ((1 << size) - 1)
+    return full, first_col, first_col << (size - 1)
+
+
+def spread(size, bits):
+    # Every cell orthogonally adjacent to a set bit, for the whole grid at once
+    full, first_col, last_col = board_masks(size)
+    return (((bits & ~last_col) << 1) | ((bits & ~first_col) >> 1)
+            | ((bits << size) & full) | (bits >> size))
+
+
+class WumpusWorld:
+    # Headless game engine: holds the world and applies the rules, nothing else.
+    # Every action records what happened in `self.event` so a front end can
+    # decide how to present it.
+    #
+    # The layout is kept as integer bitboards indexed by cell_index() for
+    # whole-grid work (percept maps, flood fills, replay files). What is
+    # looked up or changed one square at a time (pits, percepts, live
+    # wumpuses, visited squares) is a per-cell map with one byte per
+    # cell_index(), so a move or a percept costs the same on any board size.
+    #
+    # `wumpus` is one cell or a sequence of cells. Arrows fly along the whole
+    # row or column and kill the first live wumpus in their path, which is
+    # looked up by bisection in per-row and per-column sorted indexes.
+    def __init__(self, size=GRID_SIZE, gold=(3, 3), wumpus=(4, 4), pits=((1, 4), (3, 1))):
+        self.set_layout(size, gold, wumpus, pits)
+        self.reset()
+
+    def set_layout(self, size, gold, wumpus, pits):
+        if size < 2:
+            raise ValueError("The world must be at least 2x2")
+        self.size = size
+        self.gold = tuple(gold)
+        self.wumpuses = as_cells(wumpus)
+        if not self.wumpuses:
+            raise ValueError("The world needs at least one wumpus")
+        self.wumpus = self.wumpuses[0]
+        self.gold_bits = to_bitboard(size, [self.gold])
+        self.initial_wumpus_bits = to_bitboard(size, self.wumpuses)
+        self.pit_bits = to_bitboard(size, pits)
+
+        # ({y: sorted xs}, {x: sorted ys}) of every wumpus in the layout. Dead
+        # ones are skipped by testing wumpus_map, so the index never changes
+        # during a game and restore() has nothing to rebuild.
+        rows, cols = {}, {}
+        for x, y in iter_cells(size, self.initial_wumpus_bits):
+            rows.setdefault(y, []).append(x)
+            cols.setdefault(x, []).append(y)
+        self.wumpus_lines = (rows, cols)
+
+        # Percept maps for the whole grid, computed once per world
+        self.pit_map = to_cell_map(size, self.pit_bits)
+        self.breeze_map = to_cell_map(size, spread(size, self.pit_bits))
+        self.initial_state = GameState(
+            position=START, score=START_SCORE, timer=0, has_gold=False,
+            has_arrow=True, wumpus_dead=False,
+            wumpus_map=cell_map(size, self.wumpuses),
+            visited=cell_map(size, [START]),
+            stench_map=cell_map(size, iter_cells(size, spread(size, self.initial_wumpus_bits))),
+            glitter_map=cell_map(size, [self.gold]),
+            scream=False, done=False, outcome=None,
+        )
+
+    @property
+    def pits(self):
+        return frozenset(iter_cells(self.size, self.pit_bits))
+
+    @property
+    def live_wumpuses(self):
+        return frozenset(iter_marked(self.size, self.wumpus_map))
+
+    def close(self):
+        # Nothing to release; backends holding external state override this
+        pass
+
+    def reset(self):
+        self.restore(self.initial_state)
+        return self.percepts()
+
+    def snapshot(self):
+        return GameState(
+            self.position, self.score, self.timer, self.has_gold, self.has_arrow,
+            self.wumpus_dead, self._freeze("wumpus_map"), self._freeze("visited"),
+            self._freeze("stench_map"), self._freeze("glitter_map"), self.scream,
+            self.done, self.outcome,
+        )
+
+    def restore(self, state):
+        (self.position, self.score, self.timer, self.has_gold, self.has_arrow,
+         self.wumpus_dead, self.wumpus_map, self.visited, self.stench_map,
+         self.glitter_map, self.scream, self.done, self.outcome) = state
+        self.event = None
+        self._planner = None
+
+    # The world and its snapshots share the per-cell maps as bytes. A map is
+    # copied into a bytearray on its first change after a snapshot or
+    # restore, so restoring is a few references and only maps that changed
+    # are ever copied.
+
+    def _freeze(self, name):
+        cells = getattr(self, name)
+        if not isinstance(cells, bytes):
+            cells = bytes(cells)
+            setattr(self, name, cells)
+        return cells
+
+    def _mark(self, name, x, y, value):
+        cells = getattr(self, name)
+        if isinstance(cells, bytes):
+            cells = bytearray(cells)
+            setattr(self, name, cells)
+        cells[cell_index(self.size, x, y)] = value
+
+    def step(self, action):
+        if action in DIRECTIONS:
+            dx, dy = DIRECTIONS[action]
+            x, y = self.position
+            self.move_to(x + dx, y + dy)
+        elif action.startswith("shoot_"):
+            self.shoot(action[len("shoot_"):])
+        elif action == "grab":
+            self.grab()
+        elif action == "climb":
+            self.climb()
+        else:
+            raise ValueError(f"Unknown action: {action!r}")
+        return self.percepts(), self.score, self.done
+
+    @property
+    def planner(self):
+        # Routes over visited squares, built on first use after a restore and
+        # then extended square by square as the agent explores
+        if self._planner is None:
+            self._planner = SafePlanner(self.size, iter_marked(self.size, self.visited))
+        return self._planner
+
+    def line_of_fire(self, direction):
+        # First live wumpus an arrow shot from here in `direction` would hit
+        dx, dy = DIRECTIONS[direction]
+        x, y = self.position
+        rows, cols = self.wumpus_lines
+        if dy == 0:
+            line, here, step = rows.get(y, ()), x, dx
+        else:
+            line, here, step = cols.get(x, ()), y, dy
+        i = bisect_right(line, here) if step > 0 else bisect_left(line, here) - 1
+        while 0 <= i < len(line):
+            cell = (line[i], y) if dy == 0 else (x, line[i])
+            if self.wumpus_map[cell_index(self.size, *cell)]:
+                return cell
+            i += step
+        return None
+
+    def _kill_wumpus(self, x, y):
+        self._mark("wumpus_map", x, y, 0)
+        size, wumpus_map = self.size, self.wumpus_map
+        if 1 not in wumpus_map:
+            self.stench_map = bytes(size * size)
+        else:
+            # Only the dead wumpus's neighbours can lose their stench
+            for cell in self.neighbors(x, y):
+                if not any(wumpus_map[cell_index(size, *n)] for n in self.neighbors(*cell)):
+                    self._mark("stench_map", *cell, 0)
+        self.scream = True
+
+    def _visit(self, x, y):
+        if not self.visited[cell_index(self.size, x, y)]:
+            if self._planner is not None:
+                self._planner.add((x, y))
+            self._mark("visited", x, y, 1)
+
+    def route_to(self, target):
+        # Squares to walk through to reach `target` over visited squares, or
+        # None. The target may be an unvisited square next to a visited one.
+        target = tuple(target)
+        if not self.in_bounds(*target):
+            return None
+        return self.planner.route(self.position, target)
+
+    def in_bounds(self, x, y):
+        return 1 <= x <= self.size and 1 <= y <= self.size
+
+    def neighbors(self, x, y):
+        return grid_neighbors(self.size, x, y)
+
+    def is_adjacent(self, a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and self.in_bounds(*b)
+
+    def percepts(self):
+        return self.percepts_at(*self.position)
+
+    def percepts_at(self, x, y):
+        # What square (x, y) shows in the current state; the scream is only
+        # heard where the agent stands
+        index = cell_index(self.size, x, y)
+        return Percepts(
+            breeze=bool(self.breeze_map[index]),
+            stench=bool(self.stench_map[index]),
+            glitter=bool(self.glitter_map[index]),
+            scream=self.scream and (x, y) == self.position,
+        )
+
+    def visited_cells(self):
+        return iter_marked(self.size, self.visited)
+
+    def _begin_action(self):
+        self.scream = False
+        if self.done:
+            self.event = "game_over"
+            return False
+        return True
+
+    def move_to(self, x, y):
+        if not self._begin_action():
+            return self.event
+        if not self.is_adjacent(self.position, (x, y)):
+            self.event = "invalid_move"
+            return self.event
+
+        index = cell_index(self.size, x, y)
+        self.position = (x, y)
+        self._visit(x, y)
+        self.timer += 1
+        self.score -= MOVE_COST
+
+        if self.pit_map[index]:
+            self._finish("pit")
+        elif self.wumpus_map[index]:
+            self._finish("wumpus")
+        else:
+            self.event = "moved"
+        return self.event
+
+    def go_to(self, x, y):
+        # Multi-step move along route_to((x, y)), one move_to() per square;
+        # stops early if a step ends the game. "no_route" when there is none.
+        if not self._begin_action():
+            return self.event
+        route = self.route_to((x, y))
+        if not route:
+            self.event = "no_route"
+            return self.event
+        for cell in route:
+            if self.move_to(*cell) != "moved":
+                break
+        return self.event
+
+    def shoot(self, direction):
+        if not self._begin_action():
+            return self.event
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction!r}")
+        if not self.has_arrow:
+            self.event = "no_arrow"
+            return self.event
+
+        self.has_arrow = False
+        self.score -= SHOOT_COST
+
+        target = self.line_of_fire(direction)
+        if target is not None:
+            self._kill_wumpus(*target)
+            self.wumpus_dead = 1 not in self.wumpus_map
+            self.event = "killed_wumpus"
+        else:
+            self.event = "missed"
+        return self.event
+
+    def grab(self):
+        if not self._begin_action():
+            return self.event
+        if self.position == self.gold and not self.has_gold:
+            self.has_gold = True
+            self._mark("glitter_map", *self.gold, 0)
+            self.score += GOLD_REWARD
+            self.event = "grabbed_gold"
+        else:
+            self.event = "no_gold"
+        return self.event
+
+    def climb(self):
+        if not self._begin_action():
+            return self.event
+        if self.position != START:
+            self.event = "wrong_location"
+        elif not self.has_gold:
+            self.event = "climb_without_gold"
+        else:
+            self._finish("won")
+        return self.event
+
+    def _finish(self, outcome):
+        self.done = True
+        self.outcome = outcome
+        self.event = outcome
+
+
+def random_layout(seed, size=GRID_SIZE, pit_density=PIT_DENSITY, wumpuses=1):
+    # Layout for a seeded world: gold and wumpus anywhere but the start, and
+    # a pit in every other square with probability pit_density. With more
+    # than one wumpus, "wumpus" is a list of distinct cells.
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(1, size + 1) for x in range(1, size + 1) if (x, y) != START]
+    return {
+        "size": size,
+        "gold": rng.choice(cells),
+        "wumpus": rng.choice(cells) if wumpuses == 1 else rng.sample(cells, wumpuses),
+        "pits": [cell for cell in cells if rng.random() < pit_density],
+    }
+
+
+def random_world(seed, size=GRID_SIZE, pit_density=PIT_DENSITY, wumpuses=1):
+    return WumpusWorld(**random_layout(seed, size, pit_density, wumpuses))
+
+
+def reachable(size, start_bits, blocked_bits):
+    # Flood fill over the bitboard: every cell reachable from start_bits
+    # without entering blocked_bits, one BFS layer per spread()
+    seen = start_bits & ~blocked_bits
+    layer = seen
+    while layer:
+        layer = spread(size, layer) & ~blocked_bits & ~seen
+        seen |= layer
+    return seen
+
+
+def is_solvable(layout):
+    # The gold can be reached from the start without stepping into a pit or
+    # onto a wumpus (so without relying on the arrow)
+    size = layout["size"]
+    blocked = to_bitboard(size, layout["pits"]) | to_bitboard(size, as_cells(layout["wumpus"]))
+    gold = to_bitboard(size, [layout["gold"]])
+    return bool(reachable(size, to_bitboard(size, [START]), blocked) & gold)